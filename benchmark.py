@@ -0,0 +1,270 @@
+"""
+Benchmark harness for the dispatch pipeline on synthetic data.
+
+Generates a fleet, fires and water sources of the requested size, points
+the (in-memory) configuration at them and times each stage: loading, water
+source selection, model build, solve, solution parsing and the basic
+dispatcher. Results are written as JSON so runs can be compared across
+commits. config.json is never modified.
+
+Usage:
+    python benchmark.py --preset small
+    python benchmark.py --airframes 200 --helipads 40 --fires 1000 --days 3
+    python benchmark.py --preset medium --compare benchmark_results/old.json
+"""
+
+import os
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+from collections import defaultdict
+from typing import Dict, Any, Optional
+import numpy as np
+import pandas as pd
+
+from utils import config, GeoUtils, ScenarioGenerator
+from data_loader import DataLoader
+
+# Bounding box of synthetic locations (mainland South Korea)
+LAT_RANGE = (34.6, 38.2)
+LNG_RANGE = (126.3, 129.3)
+
+# Scale presets: airframes, helipads, fires, days, water sources
+PRESETS = {
+    'small': dict(airframes=48, helipads=13, fires=100, days=1, water=2000),
+    'medium': dict(airframes=200, helipads=40, fires=1000, days=7, water=20000),
+    'large': dict(airframes=1000, helipads=150, fires=10000, days=30, water=100000),
+}
+
+RESULTS_DIR = "benchmark_results"
+
+
+class SyntheticData:
+    """Random fleets, fires and water sources in the format of the static/ files."""
+
+    @staticmethod
+    def helipads(num_helipads: int, rng: np.random.Generator) -> pd.DataFrame:
+        """Helipads (lat, lng, name) spread uniformly over the bounding box."""
+        return pd.DataFrame({
+            'lat': rng.uniform(*LAT_RANGE, num_helipads),
+            'lng': rng.uniform(*LNG_RANGE, num_helipads),
+            'name': [f"helipad{i}" for i in range(num_helipads)],
+        })
+
+    @staticmethod
+    def fleet(num_airframes: int, helipads: pd.DataFrame, specs: pd.DataFrame,
+              rng: np.random.Generator) -> pd.DataFrame:
+        """Airframes in set_helis.csv format, with random bases and models."""
+        base = rng.integers(len(helipads), size=num_airframes)
+        return pd.DataFrame({
+            'id': np.arange(num_airframes),
+            'base': base,
+            'base_nm': helipads['name'].to_numpy()[base],
+            'model': rng.choice(specs['model_id'].to_numpy(), size=num_airframes),
+            'status': 1,
+        })
+
+    @staticmethod
+    def helinfo(fleet: pd.DataFrame, helipads: pd.DataFrame, specs: pd.DataFrame) -> pd.DataFrame:
+        """Per-helipad airframe counts in helinfo.csv format (basic dispatcher input)."""
+        model_names = specs.set_index('model_id')['model_nm']
+        by_base = fleet.groupby('base')['model']
+        bases = helipads.iloc[by_base.size().index]
+        return pd.DataFrame({
+            'name': bases['name'].to_numpy(),
+            'lng': bases['lng'].to_numpy(),
+            'lat': bases['lat'].to_numpy(),
+            'helicopters': by_base.size().to_numpy(),
+            'model': by_base.agg(lambda m: ", ".join(model_names[sorted(set(m))])).to_numpy(),
+        })
+
+    @staticmethod
+    def fires(num_fires: int, days: int, helipads: pd.DataFrame,
+              rng: np.random.Generator, start: str = "2025-03-20") -> pd.DataFrame:
+        """Fires in fireinfo.csv format scattered around helipads over `days` days."""
+        near = rng.integers(len(helipads), size=num_fires)
+        minutes = np.sort(rng.integers(0, days * 24 * 60, size=num_fires))
+        timestamps = pd.Timestamp(start) + pd.to_timedelta(minutes, unit='m')
+        return pd.DataFrame({
+            'name': [f"fire{i}" for i in range(num_fires)],
+            'lat': helipads['lat'].to_numpy()[near] + rng.normal(0, 0.3, num_fires),
+            'lng': helipads['lng'].to_numpy()[near] + rng.normal(0, 0.3, num_fires),
+            'date': timestamps.strftime("%Y-%m-%d"),
+            'time': timestamps.strftime("%H:%M"),
+            'intensity': rng.integers(1, 4, size=num_fires),
+        })
+
+    @staticmethod
+    def water_sources(num_sources: int, rng: np.random.Generator) -> np.ndarray:
+        """(n, 2) water source coordinates over the bounding box."""
+        return np.column_stack([rng.uniform(*LAT_RANGE, num_sources),
+                                rng.uniform(*LNG_RANGE, num_sources)])
+
+
+def _git_commit() -> Optional[str]:
+    """Current commit hash, if run inside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _instrument(optimizer, timing: Dict[str, float], counts: Dict[str, int]):
+    """Accumulate per-stage wall time of the optimizer's calls into timing."""
+    from pyomo_optimizer import _timed
+
+    optimizer.compute_distances = _timed(optimizer.compute_distances, timing, 'water_sources')
+    optimizer.parse_solution = _timed(optimizer.parse_solution, timing, 'parse_solution')
+    build_model = optimizer.build_model
+
+    def timed_build_model(*args, **kwargs):
+        optimizer.last_timing = {}
+        result = build_model(*args, **kwargs)
+        counts['models'] += 1
+        for phase, seconds in optimizer.last_timing.items():
+            # Build-time phases vs solver phases (write / solve / load)
+            timing[phase if phase in ('build', 'heuristic') else 'solve'] += seconds
+        return result
+
+    optimizer.build_model = timed_build_model
+
+
+def run_benchmark(airframes: int, helipads: int, fires: int, days: int, water: int,
+                  seed: int = 0, skip_optimized: bool = False) -> Dict[str, Any]:
+    """Generate one synthetic instance, run both dispatchers and return timings."""
+    from dispatcher import BasicDispatcher, solve_scenario_group
+    from pyomo_optimizer import PyomoOptimizer
+
+    rng = np.random.default_rng(seed)
+    specs = DataLoader.load_helicopter_specs()
+    helipad_df = SyntheticData.helipads(helipads, rng)
+    fleet_df = SyntheticData.fleet(airframes, helipad_df, specs, rng)
+    fire_df = SyntheticData.fires(fires, days, helipad_df, rng)
+    water_pts = SyntheticData.water_sources(water, rng)
+
+    timing = defaultdict(float)
+    counts = defaultdict(int)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Point the in-memory config at the synthetic files
+        paths = {
+            'HELIPADS_PATH': helipad_df, 'SETHELIS_PATH': fleet_df, 'FIREINFO_PATH': fire_df,
+            'HELINFO_PATH': SyntheticData.helinfo(fleet_df, helipad_df, specs),
+        }
+        original_paths = {attr: getattr(config, attr) for attr in paths}
+        for attr, df in paths.items():
+            path = os.path.join(tmp, attr.lower() + ".csv")
+            df.to_csv(path, index=False)
+            setattr(config, attr, path)
+
+        try:
+            start = time.perf_counter()
+            fire_table = DataLoader.load_fires()
+            optimizer = None
+            if not skip_optimized:
+                base_water_dist = GeoUtils.distance_matrix(
+                    DataLoader.load_helipads().coords, water_pts
+                )
+                optimizer = PyomoOptimizer(base_water_dist=base_water_dist)
+            timing['load'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            basic_df = BasicDispatcher().dispatch(fire_table)
+            timing['basic_dispatch'] = time.perf_counter() - start
+        finally:
+            for attr, path in original_paths.items():
+                setattr(config, attr, path)
+
+    if optimizer is not None:
+        _instrument(optimizer, timing, counts)
+        start = time.perf_counter()
+        groups = ScenarioGenerator.group_by_time_proximity(fire_table)
+        timing['grouping'] = time.perf_counter() - start
+
+        assigned = 0
+        start = time.perf_counter()
+        for group in groups:
+            solution_df = solve_scenario_group(optimizer, water_pts, fire_table.take(group), group)
+            if "Hel Index" in solution_df:
+                assigned += int(solution_df["Hel Index"].notna().sum())
+        timing['optimized_total'] = time.perf_counter() - start
+        counts.update(groups=len(groups), assigned_airframes=assigned)
+    counts['basic_rows'] = len(basic_df)
+
+    return {
+        'params': dict(airframes=airframes, helipads=helipads, fires=fires, days=days,
+                       water=water, seed=seed),
+        'stages': {stage: round(seconds, 6) for stage, seconds in timing.items()},
+        'counts': dict(counts),
+    }
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]):
+    """Print per-stage timings of two result files side by side."""
+    old_stages, new_stages = previous['stages'], current['stages']
+    print(f"{'stage':<18}{'previous':>12}{'current':>12}{'ratio':>8}")
+    for stage in sorted(set(old_stages) | set(new_stages)):
+        old, new = old_stages.get(stage), new_stages.get(stage)
+        ratio = f"{new / old:.2f}" if old and new is not None else "-"
+        fmt = lambda v: f"{v:.4f}" if v is not None else "-"
+        print(f"{stage:<18}{fmt(old):>12}{fmt(new):>12}{ratio:>8}")
+
+
+def main():
+    """Parse arguments, run the benchmark and write the JSON result."""
+    parser = argparse.ArgumentParser(description="Benchmark the dispatch pipeline on synthetic data")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    for name in ('airframes', 'helipads', 'fires', 'days', 'water'):
+        parser.add_argument(f"--{name}", type=int, help=f"override the preset's {name}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--solver", help="solver name for this run (config.json is not changed)")
+    parser.add_argument("--heuristic", action="store_true",
+                        help="enable the greedy heuristic fast path / MILP warm start for this run")
+    parser.add_argument("--latency-budget", type=float, help="heuristic.latency_budget_s for this run")
+    parser.add_argument("--skip-optimized", action="store_true", help="only run the basic dispatcher")
+    parser.add_argument("--output", help=f"result file (default: {RESULTS_DIR}/<commit>-<preset>.json)")
+    parser.add_argument("--compare", help="previous result file to compare against")
+    args = parser.parse_args()
+
+    params = dict(PRESETS[args.preset])
+    for name in params:
+        if getattr(args, name) is not None:
+            params[name] = getattr(args, name)
+    if args.solver:
+        config.config['solver']['name'] = args.solver
+    if args.heuristic or args.latency_budget is not None:
+        heuristic = config.config.setdefault('heuristic', {})
+        heuristic['enabled'] = True
+        if args.latency_budget is not None:
+            heuristic['latency_budget_s'] = args.latency_budget
+
+    result = run_benchmark(seed=args.seed, skip_optimized=args.skip_optimized, **params)
+    commit = _git_commit()
+    result.update(
+        commit=commit,
+        preset=args.preset,
+        solver=None if args.skip_optimized else config.get_solver_config()['name'],
+        heuristic=config.get_heuristic_params(),
+        timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        python=platform.python_version(),
+        platform=platform.platform(),
+    )
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'local'}-{args.preset}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+
+    print(json.dumps(result['stages'], indent=2))
+    print(json.dumps(result['counts']))
+    print(f"Results written to {output}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Startup budget check for the CLI entry point.
+
+Imports main.py in a fresh interpreter and fails (exit code 1) when the
+import takes longer than the budget or loads dependencies that should only
+be imported by the code paths that need them.
+
+Usage: python check_startup.py [budget_seconds]
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+# Default import-time budget (seconds) for `import main`
+IMPORT_BUDGET_S = 1.0
+
+# Heavy dependencies that must not be imported at startup
+DEFERRED_MODULES = ('pyomo', 'geopandas', 'geopy', 'scipy', 'highspy')
+
+# Best-of runs, to keep the check stable on a busy machine
+RUNS = 3
+
+PROBE = (
+    "import json, sys, time\n"
+    "start = time.perf_counter()\n"
+    "import main\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print(json.dumps({'seconds': elapsed, "
+    "'loaded': [m for m in %r if m in sys.modules]}))\n" % (DEFERRED_MODULES,)
+)
+
+
+def measure_startup() -> dict:
+    """Import main in a fresh interpreter; returns {'seconds', 'loaded'}."""
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Run the check and exit non-zero on failure."""
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else IMPORT_BUDGET_S
+    runs = [measure_startup() for _ in range(RUNS)]
+    seconds = min(run['seconds'] for run in runs)
+    loaded = sorted(set().union(*(run['loaded'] for run in runs)))
+
+    print(f"import main: {seconds:.3f}s (budget {budget:.3f}s)")
+    ok = True
+    if seconds > budget:
+        print("FAIL: import time over budget")
+        ok = False
+    if loaded:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(loaded)}")
+        ok = False
+    if ok:
+        print("OK")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
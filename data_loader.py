@@ -2,16 +2,35 @@
 DataManager class for loading and processing data files for wildfire helicopter dispatch.
 """
 
+import os
+import json
+import hashlib
+import numpy as np
 import pandas as pd
-import geopandas as gpd
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Any, Optional, Callable, Iterator
 
-from utils import config
+from utils import config, GeoUtils
+from fleet import FireTable, Helipads, FIRE_TIME_FORMAT
+from instrumentation import instrumentation
 
 class DataLoader:
     """Handles loading and processing of data files."""
     
+    # Column types of fireinfo.csv
+    FIRE_DTYPES = {
+        'name': str,
+        'lat': 'float64',
+        'lng': 'float64',
+        'date': str,
+        'time': str,
+        'intensity': 'int64',
+    }
+    
+    # Rows per batch when streaming fire records
+    FIRE_CHUNK_SIZE = 50000
+    
     @staticmethod
+    @instrumentation.timed('load_helicopters')
     def load_helicopters() -> pd.DataFrame:
         """Load helicopter data from CSV file."""
         try:
@@ -24,6 +43,7 @@ class DataLoader:
             return pd.DataFrame()
 
     @staticmethod
+    @instrumentation.timed('load_helicopter_specs')
     def load_helicopter_specs() -> pd.DataFrame:
         """Load helicopter specifications from CSV file."""
         try:
@@ -36,42 +56,52 @@ class DataLoader:
             return pd.DataFrame()
     
     @staticmethod
-    def load_helipads() -> List[Tuple[float, float, str]]:
+    @instrumentation.timed('load_helipads')
+    def load_helipads() -> Helipads:
         """Load helipad data from CSV file."""
         try:
-            df = pd.read_csv(config.HELIPADS_PATH)
-            return [(row['lat'], row['lng'], row['name']) for _, row in df.iterrows()]
+            return Helipads.from_frame(pd.read_csv(config.HELIPADS_PATH))
         except FileNotFoundError:
             print(f"Error: Helipads data file not found at {config.HELIPADS_PATH}")
-            return []
+            return Helipads([], [], [])
         except Exception as e:
             print(f"Error loading helipads data: {e}")
-            return []
+            return Helipads([], [], [])
     
     @staticmethod
-    def load_fires() -> List[Dict[str, Any]]:
+    def iter_fire_batches(path: Optional[str] = None,
+                          chunksize: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """Stream fire records from CSV in typed, columnar batches.
+        
+        Each batch carries the fireinfo columns plus a datetime64 'timestamp'
+        parsed once per batch; the index continues across batches.
+        """
+        reader = pd.read_csv(path or config.FIREINFO_PATH,
+                             usecols=list(DataLoader.FIRE_DTYPES),
+                             dtype=DataLoader.FIRE_DTYPES,
+                             chunksize=chunksize or DataLoader.FIRE_CHUNK_SIZE)
+        for batch in reader:
+            batch['timestamp'] = pd.to_datetime(batch['date'] + " " + batch['time'],
+                                                format=FIRE_TIME_FORMAT)
+            yield batch
+    
+    @staticmethod
+    @instrumentation.timed('load_fires')
+    def load_fires() -> FireTable:
         """Load fire data from CSV file."""
         try:
-            df = pd.read_csv(config.FIREINFO_PATH)
-            fires = []
-            for _, row in df.iterrows():
-                fires.append({
-                    'name': row['name'],
-                    'lat': float(row['lat']),
-                    'lng': float(row['lng']),
-                    'date': str(row['date']),
-                    'time': str(row['time']),
-                    'intensity': int(row['intensity'])
-                })
-            return fires
+            return FireTable.concat([
+                FireTable.from_frame(batch) for batch in DataLoader.iter_fire_batches()
+            ])
         except FileNotFoundError:
             print(f"Error: Fire data file not found at {config.FIREINFO_PATH}")
-            return []
+            return FireTable.empty()
         except Exception as e:
             print(f"Error loading fire data: {e}")
-            return []
+            return FireTable.empty()
     
     @staticmethod
+    @instrumentation.timed('load_detailed_helicopters')
     def load_detailed_helicopters() -> pd.DataFrame:
         """Load detailed helicopter configuration."""
         try:
@@ -88,15 +118,114 @@ class DataLoader:
             print(f"Error loading detailed helicopter data: {e}")
             return pd.DataFrame()
     
+    # Shapefile components whose changes invalidate the water source cache
+    WATER_SOURCE_EXTS = ('.shp', '.shx', '.dbf', '.prj', '.cpg')
+    
     @staticmethod
-    def load_water_sources() -> List[Tuple[float, float]]:
-        """Load water sources from shapefile."""
+    def _file_signature(path: str) -> Optional[List[int]]:
+        """(mtime_ns, size) of a file, or None if it does not exist."""
         try:
-            gdf = gpd.read_file(config.SHAPEFILE_WATER, encoding='euc-kr').to_crs(epsg=4326)
-            return [(geom.y, geom.x) for geom in gdf.geometry]  # (lat, lng)
+            st = os.stat(path)
+            return [st.st_mtime_ns, st.st_size]
         except FileNotFoundError:
+            return None
+    
+    @staticmethod
+    def _water_source_signature() -> Dict[str, Optional[List[int]]]:
+        """(mtime_ns, size) of each shapefile component; None if absent."""
+        stem = os.path.splitext(config.SHAPEFILE_WATER)[0]
+        return {ext: DataLoader._file_signature(stem + ext) for ext in DataLoader.WATER_SOURCE_EXTS}
+    
+    @staticmethod
+    def water_sources_version() -> str:
+        """Fingerprint of the water source data, changing whenever the shapefile does."""
+        payload = json.dumps(DataLoader._water_source_signature(), sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()[:16]
+    
+    @staticmethod
+    def _read_water_shapefile() -> np.ndarray:
+        """Read and reproject the water source shapefile to an (N, 2) lat-lng array."""
+        # Imported here so a warm cache never needs GDAL
+        import geopandas as gpd
+        
+        gdf = gpd.read_file(config.SHAPEFILE_WATER, encoding='euc-kr').to_crs(epsg=4326)
+        return np.column_stack([gdf.geometry.y.to_numpy(dtype=float),
+                                gdf.geometry.x.to_numpy(dtype=float)])  # (lat, lng)
+    
+    @staticmethod
+    def _load_cached_array(cache_path: str, signature: Dict[str, Any], 
+                           builder: Callable[[], np.ndarray]) -> np.ndarray:
+        """Memory-map a cached .npy array, rebuilding it when its signature changes.
+        
+        The signature is stored in a .json file next to the array.
+        """
+        meta_path = os.path.splitext(cache_path)[0] + '.json'
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                if json.load(f).get('signature') == signature:
+                    return np.load(cache_path, mmap_mode='r')
+        except (FileNotFoundError, ValueError, OSError):
+            pass
+        
+        array = np.ascontiguousarray(builder(), dtype=float)
+        try:
+            os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+            with open(cache_path + '.tmp', 'wb') as f:
+                np.save(f, array)
+            os.replace(cache_path + '.tmp', cache_path)
+            with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump({'signature': signature}, f)
+            os.replace(meta_path + '.tmp', meta_path)
+            return np.load(cache_path, mmap_mode='r')
+        except OSError as e:
+            print(f"Warning: Could not write cache {cache_path}: {e}")
+            return array
+    
+    @staticmethod
+    @instrumentation.timed('load_water_sources')
+    def load_water_sources() -> np.ndarray:
+        """Load water sources as a read-only (N, 2) array of (lat, lng).
+        
+        The reprojected coordinates are cached as a memory-mapped .npy file
+        next to the shapefile and rebuilt only when a shapefile component changes.
+        """
+        signature = DataLoader._water_source_signature()
+        if signature['.shp'] is None:
             print(f"Warning: Water sources shapefile not found at {config.SHAPEFILE_WATER}")
-            return []
+            return np.empty((0, 2))
+        
+        cache_path = os.path.splitext(config.SHAPEFILE_WATER)[0] + '.coords.npy'
+        try:
+            return DataLoader._load_cached_array(
+                cache_path, signature, DataLoader._read_water_shapefile
+            )
         except Exception as e:
             print(f"Warning: Failed to load water sources shapefile: {e}")
-            return []
\ No newline at end of file
+            return np.empty((0, 2))
+    
+    @staticmethod
+    @instrumentation.timed('load_base_water_distances')
+    def load_base_water_distances() -> np.ndarray:
+        """Load the helipad x water source distance matrix (km).
+        
+        Rows follow helipads.csv, columns follow load_water_sources(). The matrix
+        is persisted in the cache directory and recomputed only when the helipads
+        file, the water sources or the distance mode change.
+        """
+        helipads = DataLoader.load_helipads()
+        water_pts = DataLoader.load_water_sources()
+        if not helipads or len(water_pts) == 0:
+            return np.empty((len(helipads), 0))
+        
+        mode = config.get_geo_params().get('distance_mode', 'geodesic')
+        signature = {
+            'helipads': DataLoader._file_signature(config.HELIPADS_PATH),
+            'water_sources': DataLoader.water_sources_version(),
+            'distance_mode': mode,
+        }
+        cache_path = os.path.join(config.CACHE_DIR, 'base_water_dist.npy')
+        base_locs = helipads.coords
+        return DataLoader._load_cached_array(
+            cache_path, signature,
+            lambda: GeoUtils.distance_matrix(base_locs, water_pts, mode)
+        )
@@ -4,13 +4,22 @@ This module contains the dispatcher classes for helicopter dispatch optimization
 Separated from main_dispatch.py for better code organization.
 """
 
+import heapq
 import random
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Iterable, Iterator, TYPE_CHECKING
 
-from utils import config, GeoUtils, ScenarioGenerator
+from utils import config, GeoUtils, ScenarioGenerator, Coords
 from data_loader import DataLoader
-from pyomo_optimizer import PyomoOptimizer
+from fleet import FireTable, Fires
+from instrumentation import instrumentation
+from solution_cache import solution_cache
+
+if TYPE_CHECKING:
+    # Imported lazily at runtime: Pyomo is only needed for optimized dispatch
+    from pyomo_optimizer import PyomoOptimizer
 
 
 class BasicDispatcher:
@@ -21,10 +30,11 @@ class BasicDispatcher:
         sim_params = config.get_simulation_params()
         random.seed(sim_params['random_seed'])
         
-    def dispatch(self, fire_points: List[Dict[str, Any]]) -> pd.DataFrame:
+    def dispatch(self, fire_points: Fires) -> pd.DataFrame:
         """Perform basic helicopter dispatch based on distance."""
-        if not fire_points:
+        if not len(fire_points):
             return pd.DataFrame()
+        fires = FireTable.coerce(fire_points)
             
         # Load helicopter data
         helicopters_df = DataLoader.load_helicopters()
@@ -32,36 +42,29 @@ class BasicDispatcher:
             print("Cannot perform basic dispatch: No helicopter data available")
             return pd.DataFrame()
             
-        # Make a copy and add available column
-        heli_copy = helicopters_df.copy()
-        heli_copy['available'] = heli_copy['helicopters']
+        # Availability counter per helipad row
+        total = helicopters_df['helicopters'].to_numpy(dtype=int)
+        names = helicopters_df['name'].tolist()
+        models = helicopters_df['model'].tolist()
         
         dispatch_log = []
         
         # Get configuration parameters
-        max_range = config.get_optimization_params()['max_helicopter_range_km']
         fire_needs = config.get_simulation_params()['fire_helicopter_needs']
+        ranking, in_range = self.rank_helipads(fires, helicopters_df)
         
-        # Process each fire
-        for fire in fire_points:
-            fire_loc = (fire['lat'], fire['lng'])
-            
-            # Calculate distance to each helipad
-            heli_copy['distance'] = heli_copy.apply(
-                lambda row: GeoUtils.calculate_distance(fire_loc, (row['lat'], row['lng'])), 
-                axis=1
-            )
-            
-            # Filter by maximum range and sort by distance
-            near_heli = heli_copy[heli_copy['distance'] <= max_range].sort_values('distance')
-            
-            # Determine helicopters needed based on fire intensity
-            needed = random.choices(fire_needs['options'], weights=fire_needs['weights'])[0]
+        # Helicopters needed per fire; one draw of k values matches k single draws
+        needs = random.choices(fire_needs['options'], weights=fire_needs['weights'],
+                               k=len(fires))
+        
+        # Process each fire (a single replication)
+        for fire_pos, near_heli, served, to_send in self.allocate(ranking, in_range, total, np.asarray([needs])):
+            fire_name = fires.name[fire_pos]
             
             # Handle case where no helicopter is in range
-            if near_heli.empty:
+            if near_heli.size == 0:
                 dispatch_log.append({
-                    'Fire Index': fire['name'],
+                    'Fire Index': fire_name,
                     'Heli Base': '초기대응불가',
                     'Heli Model': 'N/A',
                     'Heli Count': 0
@@ -69,33 +72,362 @@ class BasicDispatcher:
                 continue
             
             # Handle case where not enough helicopters are available
-            if near_heli['available'].sum() < needed:
+            if not served[0]:
                 dispatch_log.append({
-                    'Fire Index': fire['name'],
+                    'Fire Index': fire_name,
                     'Heli Base': '추가파견불가',
                     'Heli Model': 'N/A',
                     'Heli Count': 0
                 })
                 continue
             
-            # Allocate helicopters
-            for _, hp in near_heli.iterrows():
-                if needed <= 0:
-                    break
-                    
-                if hp['available'] > 0:
-                    to_send = min(needed, hp['available'])
-                    needed -= to_send
-                    heli_copy.at[hp.name, 'available'] -= to_send
-                    
-                    dispatch_log.append({
-                        'Fire Index': fire['name'],
-                        'Heli Base': hp['name'],
-                        'Heli Model': hp['model'],
-                        'Heli Count': f"{to_send}/{hp['helicopters']}"
-                    })
+            for pos in np.nonzero(to_send[0])[0]:
+                idx = near_heli[pos]
+                dispatch_log.append({
+                    'Fire Index': fire_name,
+                    'Heli Base': names[idx],
+                    'Heli Model': models[idx],
+                    'Heli Count': f"{to_send[0, pos]}/{total[idx]}"
+                })
         
         return pd.DataFrame(dispatch_log)
+    
+    @staticmethod
+    def rank_helipads(fires: FireTable, helicopters_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Helipad rows ranked by distance per fire, and whether each ranked helipad is in range."""
+        max_range = config.get_optimization_params()['max_helicopter_range_km']
+        
+        # Fire x helipad distance matrix in one batch, helipads ranked per fire
+        dist_matrix = GeoUtils.distance_matrix(
+            fires.coords,
+            helicopters_df[['lat', 'lng']].to_numpy(dtype=float)
+        )
+        ranking = np.argsort(dist_matrix, axis=1, kind='stable')
+        in_range = np.take_along_axis(dist_matrix <= max_range, ranking, axis=1)
+        return ranking, in_range
+    
+    @staticmethod
+    def allocate(ranking: np.ndarray, in_range: np.ndarray, capacity: np.ndarray, 
+                 needs: np.ndarray) -> Iterator[Tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+        """Send helicopters to fires in order, from the nearest in-range helipads.
+        
+        needs is a (replications x fires) array; every replication starts from
+        the same helipad capacity and is processed at once. Yields, per fire,
+        (fire position, in-range helipad rows nearest first, served flag per
+        replication, helicopters sent per replication and helipad row). A
+        replication is not served when its in-range helipads have fewer
+        helicopters left than needed; it then sends none.
+        """
+        needs = np.asarray(needs, dtype=int)
+        available = np.tile(np.asarray(capacity, dtype=int), (needs.shape[0], 1))
+        for fire_pos in range(needs.shape[1]):
+            near_heli = ranking[fire_pos][in_range[fire_pos]]
+            needed = needs[:, fire_pos]
+            near_available = available[:, near_heli]
+            served = (near_available.sum(axis=1) >= needed) & (near_heli.size > 0)
+            
+            # Allocate from the nearest helipads until the need is met
+            still_needed = needed[:, None] - (np.cumsum(near_available, axis=1) - near_available)
+            to_send = np.clip(still_needed, 0, near_available) * served[:, None]
+            available[:, near_heli] -= to_send
+            yield fire_pos, near_heli, served, to_send
+
+
+def solve_scenario_group(optimizer: "PyomoOptimizer", 
+                         water_pts: Coords, 
+                         group_fires: FireTable, 
+                         group: List[int], 
+                         available: Optional[np.ndarray] = None,
+                         distances: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]] = None) -> pd.DataFrame:
+    """Build, solve and parse the model for one scenario group.
+    
+    group_fires holds the group's fires, row i being fire index group[i].
+    available optionally masks the airframes that may be assigned.
+    distances optionally gives precomputed (airframe x group fire) d1/d2/d3
+    and leg factors as returned by compute_distances, skipping water source
+    selection.
+    With optimization.decompose_groups, fires that share no reachable
+    helicopter are solved as separate, smaller models.
+    With solution_cache.enabled, a group seen before is not solved again.
+    Returns rows with 0-based fire indices.
+    """
+    with instrumentation.scenario(fires=len(group), first_fire=int(group[0]) if len(group) else None):
+        key = None
+        if solution_cache.enabled:
+            key = solution_cache.fingerprint(optimizer, group_fires, water_pts, available, distances)
+            cached = solution_cache.get(key, group)
+            if cached is not None:
+                instrumentation.count('cache_hits')
+                return cached
+        
+        solution_df = _solve_scenario_group(optimizer, water_pts, group_fires, group, available, distances)
+        if key is not None and not solution_df.empty:
+            solution_cache.put(key, group, solution_df)
+        return solution_df
+
+
+def _solve_scenario_group(optimizer: "PyomoOptimizer", 
+                          water_pts: Coords, 
+                          group_fires: FireTable, 
+                          group: List[int], 
+                          available: Optional[np.ndarray] = None,
+                          distances: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]] = None) -> pd.DataFrame:
+    """Body of solve_scenario_group (one instrumentation record per call)."""
+    blocks = scenario_blocks(optimizer, water_pts, group_fires, group, available, distances)
+    if blocks is None:
+        return pd.DataFrame()
+    
+    solutions = []
+    for comp_fires, difficulties, comp_d1, comp_d2, comp_d3, comp_factors in blocks:
+        # Build and solve model
+        model, cost_hf, time_hf = optimizer.build_model(
+            comp_fires, difficulties, comp_d1, comp_d2, comp_d3, available, comp_factors
+        )
+        
+        if model is None:
+            # Only this component's fires go unassigned
+            continue
+            
+        # Parse solution
+        solutions.append(optimizer.parse_solution(
+            model, cost_hf, time_hf, comp_d1, comp_d2, comp_d3, fire_indices=comp_fires
+        ))
+    
+    return merge_group_solutions(group, solutions)
+
+
+def scenario_blocks(optimizer: "PyomoOptimizer", 
+                    water_pts: Coords, 
+                    group_fires: FireTable, 
+                    group: List[int], 
+                    available: Optional[np.ndarray] = None,
+                    distances: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]] = None
+                    ) -> Optional[List[Tuple[List[int], List[int], np.ndarray, np.ndarray, np.ndarray,
+                                             Optional[np.ndarray]]]]:
+    """Model inputs (fire indices, difficulties, d1, d2, d3, leg factors) of one scenario group.
+    
+    One block per reachability component with optimization.decompose_groups,
+    else a single block. None if no distances could be computed.
+    """
+    # Extract fire coordinates and intensities
+    fire_coords = group_fires.coords
+    difficulties = np.asarray(group_fires.intensity)
+    
+    # Find optimal water sources for each fire-helicopter pair
+    if distances is None:
+        distances = optimizer.compute_distances(fire_coords, water_pts)
+    d1, d2, d3, factors = distances
+    if len(d1) == 0:
+        return None
+    
+    components = [np.arange(len(group))]
+    if config.get_optimization_params().get('decompose_groups', False):
+        feasible = optimizer.reachable_pairs(d1, d2, d3, available, factors)
+        # Fires no helicopter can reach stay unassigned without a model
+        components = [
+            comp for comp in ScenarioGenerator.reachability_components(feasible)
+            if feasible[:, comp].any()
+        ]
+    instrumentation.count('components', len(components))
+    
+    return [
+        ([group[i] for i in comp], difficulties[comp].tolist(), d1[:, comp], d2[:, comp], d3[:, comp],
+         None if factors is None else factors[:, :, comp])
+        for comp in components
+    ]
+
+
+def merge_group_solutions(group: List[int], solutions: List[pd.DataFrame]) -> pd.DataFrame:
+    """Combine a group's per-block frames and add rows for its unassigned fires."""
+    solutions = [df for df in solutions if not df.empty]
+    solution_df = pd.concat(solutions, ignore_index=True) if solutions else pd.DataFrame()
+    
+    # Handle unassigned fires
+    if not solution_df.empty:
+        assigned_fires = set(solution_df["Fire Index"].tolist())
+        all_fires = set(group)
+        unassigned_fires = all_fires - assigned_fires
+        
+        for fidx in unassigned_fires:
+            solution_df = pd.concat([
+                solution_df, 
+                pd.DataFrame([{
+                    "Fire Index": fidx,
+                    "Heli Model": "초기대응 불가"
+                }])
+            ], ignore_index=True)
+    
+    return solution_df
+
+
+def solve_scenario_batch(optimizer: "PyomoOptimizer", 
+                         water_pts: Coords, 
+                         tasks: List[Tuple[List[int], FireTable]]) -> List[pd.DataFrame]:
+    """Solve several scenario groups in one block-diagonal model (one solver call).
+    
+    tasks are (group, group_fires) pairs as for solve_scenario_group; the
+    groups are independent, so each block keeps its own copy of the fleet.
+    Groups found in the solution cache are left out of the model.
+    Returns one frame per group, as solve_scenario_group would.
+    """
+    with instrumentation.scenario(fires=sum(len(group) for group, _ in tasks), groups=len(tasks)):
+        keys = [solution_cache.fingerprint(optimizer, group_fires, water_pts) if solution_cache.enabled else None
+                for _, group_fires in tasks]
+        solution_dfs = [solution_cache.get(key, group) if key is not None else None
+                        for key, (group, _) in zip(keys, tasks)]
+        instrumentation.count('cache_hits', sum(df is not None for df in solution_dfs))
+        
+        pending = [i for i, df in enumerate(solution_dfs) if df is None]
+        group_blocks = {i: scenario_blocks(optimizer, water_pts, tasks[i][1], tasks[i][0]) for i in pending}
+        results = iter(optimizer.solve_batch(
+            [block for blocks in group_blocks.values() if blocks for block in blocks]
+        ))
+        
+        for i in pending:
+            group, blocks = tasks[i][0], group_blocks[i]
+            if blocks is None:
+                solution_dfs[i] = pd.DataFrame()
+                continue
+            solutions = []
+            for comp_fires, _, comp_d1, comp_d2, comp_d3, _ in blocks:
+                model, cost_hf, time_hf = next(results)
+                solutions.append(None if model is None else optimizer.parse_solution(
+                    model, cost_hf, time_hf, comp_d1, comp_d2, comp_d3, fire_indices=comp_fires
+                ))
+            # An unsolved block leaves only its own fires unassigned, as in solve_scenario_group
+            solution_dfs[i] = merge_group_solutions(group, [df for df in solutions if df is not None])
+            if keys[i] is not None and not solution_dfs[i].empty:
+                solution_cache.put(keys[i], group, solution_dfs[i])
+        return solution_dfs
+
+
+# Per-process state of scenario pool workers
+_worker_optimizer: Optional["PyomoOptimizer"] = None
+_worker_water_pts = None
+_worker_warm = False
+
+
+def init_scenario_worker(warm_up: bool = False):
+    """Load the fleet and water sources once per worker process (and warm it up if asked)."""
+    global _worker_optimizer, _worker_water_pts
+    from pyomo_optimizer import PyomoOptimizer
+    _worker_optimizer = PyomoOptimizer()
+    _worker_water_pts = DataLoader.load_water_sources()
+    if warm_up:
+        warm_up_scenario_worker()
+
+
+def warm_up_scenario_worker() -> bool:
+    """Solve a one-fire group at the first airframe's base, once per worker.
+    
+    Builds the water source index and the solver and runs the lazy imports
+    of the solve path, so the first real scenario does not pay for them.
+    Bypasses the solution cache and instrumentation. False without a fleet.
+    """
+    global _worker_warm
+    if _worker_optimizer is None or not len(_worker_optimizer.fleet):
+        return False
+    if not _worker_warm:
+        lat, lng = _worker_optimizer.fleet.coords[0]
+        fires = FireTable(['warm-up'], [lat], [lng], [1], [np.datetime64(0, 's')])
+        _worker_optimizer._get_solver()
+        _solve_scenario_group(_worker_optimizer, _worker_water_pts, fires, [0])
+        _worker_warm = True
+    return True
+
+
+def solve_scenario_task(task: Tuple[List[int], FireTable]) -> pd.DataFrame:
+    """Solve one scenario group inside a pool worker."""
+    group, group_fires = task
+    return solve_scenario_group(_worker_optimizer, _worker_water_pts, group_fires, group)
+
+
+def solve_batch_task(tasks: List[Tuple[List[int], FireTable]]) -> List[pd.DataFrame]:
+    """Solve one batch of scenario groups inside a pool worker."""
+    return solve_scenario_batch(_worker_optimizer, _worker_water_pts, tasks)
+
+
+class RollingHorizonDispatcher:
+    """Optimized dispatch with fleet state carried across fire reports.
+    
+    Fire reports and helicopter returns are processed from one event heap in
+    time order, so work grows with the number of events rather than with
+    time steps x fleet size. Each fire is dispatched at its own report time
+    (fires reported at the same time are solved together) with only the
+    airframes that are in service and idle. An assigned airframe flies to the
+    fire and is busy for its round trip plus rolling_horizon.turnaround_minutes,
+    then is back at its base.
+    """
+    
+    # Event kinds; returns are handled before reports at the same time
+    RETURN = 0
+    REPORT = 1
+    
+    def __init__(self, optimizer: "PyomoOptimizer"):
+        """Initialize the engine over the optimizer's fleet."""
+        self.optimizer = optimizer
+        self.turnaround = config.get_rolling_horizon_params().get('turnaround_minutes', 0)
+        self.reset()
+    
+    def reset(self):
+        """Put every airframe back at its base, idle."""
+        fleet = self.optimizer.fleet
+        self.busy = np.zeros(len(fleet), dtype=bool)
+    
+    @staticmethod
+    def _to_timestamp(minutes: float) -> pd.Timestamp:
+        """Convert minutes since epoch to a timestamp."""
+        return pd.Timestamp(round(minutes * 60), unit='s')
+    
+    def run(self, fire_points: Fires) -> pd.DataFrame:
+        """Dispatch all fires in time order, returning rows with 1-based fire indices."""
+        fires = FireTable.coerce(fire_points)
+        if not len(fires):
+            return pd.DataFrame()
+        if np.isnat(fires.timestamp).any():
+            print("Cannot perform rolling-horizon dispatch: Every fire needs a date and time")
+            return pd.DataFrame()
+        
+        minutes = (fires.timestamp - np.datetime64(0, 's')) / np.timedelta64(1, 'm')
+        water_pts = DataLoader.load_water_sources()
+        in_service = self.optimizer.fleet.status > 0
+        
+        # (time, kind, sequence, payload); one report event per distinct report time
+        report_times, report_of = np.unique(minutes, return_inverse=True)
+        order = np.argsort(report_of, kind='stable')
+        reports = np.split(order, np.nonzero(np.diff(report_of[order]))[0] + 1)
+        events = [(report_times[seq], self.REPORT, seq, group.tolist())
+                  for seq, group in enumerate(reports)]
+        heapq.heapify(events)
+        seq = len(events)
+        
+        solutions = []
+        while events:
+            now, kind, _, payload = heapq.heappop(events)
+            if kind == self.RETURN:
+                self.busy[payload] = False
+                continue
+            
+            group = payload
+            solution_df = solve_scenario_group(
+                self.optimizer, water_pts, fires.take(group), group, available=in_service & ~self.busy
+            )
+            if solution_df.empty:
+                continue
+            
+            # Commit assigned airframes until they are back at base
+            dispatched = solution_df["Hel Index"].notna() if "Hel Index" in solution_df else []
+            solution_df["Dispatch Time"] = self._to_timestamp(now)
+            for row in solution_df.index[dispatched]:
+                h = int(solution_df.at[row, "Hel Index"]) - 1
+                back = now + solution_df.at[row, "Travel Time"] + self.turnaround
+                self.busy[h] = True
+                solution_df.at[row, "Return Time"] = self._to_timestamp(back)
+                heapq.heappush(events, (back, self.RETURN, seq, h))
+                seq += 1
+            solutions.append(solution_df)
+        
+        return WildfireDispatcher.finalize_results(solutions)
 
 
 class WildfireDispatcher:
@@ -106,79 +438,119 @@ class WildfireDispatcher:
         sim_params = config.get_simulation_params()
         random.seed(sim_params['random_seed'])
         self.basic_dispatcher = BasicDispatcher()
-        self.optimizer = PyomoOptimizer()
+        self._optimizer = None
+    
+    @property
+    def optimizer(self) -> "PyomoOptimizer":
+        """Optimizer over the configured fleet, created (and Pyomo imported) on first use."""
+        if self._optimizer is None:
+            from pyomo_optimizer import PyomoOptimizer
+            self._optimizer = PyomoOptimizer()
+        return self._optimizer
         
-    def dispatch_basic(self, fire_points: List[Dict[str, Any]]) -> pd.DataFrame:
+    def dispatch_basic(self, fire_points: Fires) -> pd.DataFrame:
         """Perform basic dispatch."""
         return self.basic_dispatcher.dispatch(fire_points)
     
-    def dispatch_optimized(self, fire_points: List[Dict[str, Any]]) -> pd.DataFrame:
-        """Perform optimized dispatch using Pyomo."""
-        if not fire_points:
+    def dispatch_optimized(self, fire_points: Fires) -> pd.DataFrame:
+        """Perform optimized dispatch using Pyomo.
+        
+        Scenario groups are solved in a process pool when solver.workers > 1;
+        results are merged in group order, so output does not depend on the
+        number of workers. With solver.batch_groups > 1, that many groups are
+        stacked into each (block-diagonal) model and solved with one call.
+        """
+        if not len(fire_points):
             return pd.DataFrame()
+        fires = FireTable.coerce(fire_points)
             
         # Check if optimizer is properly initialized
-        if self.optimizer.heli_df.empty or not self.optimizer.heli_locs:
+        if not len(self.optimizer.fleet):
             print("Cannot perform optimized dispatch: Missing helicopter data or configuration")
             return pd.DataFrame()
             
+        # Carry fleet state across scenarios if configured
+        if config.get_rolling_horizon_params().get('enabled', False):
+            return RollingHorizonDispatcher(self.optimizer).run(fires)
+            
         # Group fires into scenarios
-        scenario_sets = ScenarioGenerator.group_by_time_proximity(fire_points)
+        scenario_sets = ScenarioGenerator.group_by_time_proximity(fires)
         
-        # Load water sources
-        water_pts = DataLoader.load_water_sources()
+        workers = config.get_solver_config().get('workers', 1)
+        batch_groups = config.get_solver_config().get('batch_groups', 1)
+        if batch_groups > 1:
+            solutions = self._solve_groups_batched(fires, scenario_sets, batch_groups, workers)
+        elif workers > 1 and len(scenario_sets) > 1:
+            solutions = self._solve_groups_parallel(fires, scenario_sets, workers)
+        else:
+            # Load water sources
+            water_pts = DataLoader.load_water_sources()
+            solutions = [
+                solve_scenario_group(self.optimizer, water_pts, fires.take(group), group)
+                for group in scenario_sets
+            ]
         
-        result_df = pd.DataFrame()
+        return self.finalize_results(solutions)
+    
+    def dispatch_stream(self, batches: Iterable[Fires]) -> Iterator[pd.DataFrame]:
+        """Perform optimized dispatch on fires arriving in time-ordered batches.
         
-        # Process each scenario group
-        for group in scenario_sets:
-            # Extract fire coordinates and intensities
-            fire_coords = []
-            difficulties = []
-            for fidx in group:
-                fire_coords.append((fire_points[fidx]['lat'], fire_points[fidx]['lng']))
-                difficulties.append(fire_points[fidx]['intensity'])
-            
-            # Find optimal water sources for each fire-helicopter pair
-            d1, d2, d3 = GeoUtils.find_optimal_water_sources(
-                fire_coords, water_pts, self.optimizer.heli_locs
-            )
-            
-            # Build and solve model
-            model, cost_hf, time_hf = self.optimizer.build_model(
-                group, difficulties, d1, d2, d3
-            )
-            
-            if model is None:
-                continue
-                
-            # Parse solution
-            solution_df = self.optimizer.parse_solution(
-                model, cost_hf, time_hf, d1, d2, d3, offset_index=min(group)
-            )
-            
-            # Handle unassigned fires
-            if not solution_df.empty:
-                assigned_fires = set(solution_df["Fire Index"].tolist())
-                all_fires = set(group)
-                unassigned_fires = all_fires - assigned_fires
-                
-                for fidx in unassigned_fires:
-                    solution_df = pd.concat([
-                        solution_df, 
-                        pd.DataFrame([{
-                            "Fire Index": fidx,
-                            "Heli Model": "초기대응 불가"
-                        }])
-                    ], ignore_index=True)
-            
-            # Append to results
-            result_df = pd.concat([result_df, solution_df], ignore_index=True)
+        Each scenario group is solved as soon as its time window closes and its
+        result is yielded (1-based fire indices counting across batches), so
+        solving starts before the whole feed has been read.
+        """
+        if not len(self.optimizer.fleet):
+            print("Cannot perform optimized dispatch: Missing helicopter data or configuration")
+            return
+        
+        water_pts = DataLoader.load_water_sources()
+        for group, group_fires in ScenarioGenerator.stream_groups(batches):
+            result_df = self.finalize_results([
+                solve_scenario_group(self.optimizer, water_pts, group_fires, group)
+            ])
+            if not result_df.empty:
+                yield result_df
+    
+    @staticmethod
+    def finalize_results(solutions: List[pd.DataFrame]) -> pd.DataFrame:
+        """Merge per-group frames, sorted by fire with 1-based fire indices."""
+        solutions = [df for df in solutions if not df.empty]
+        if not solutions:
+            return pd.DataFrame()
+        result_df = pd.concat(solutions, ignore_index=True)
         
         # Clean up and finalize results
-        if not result_df.empty and "Fire Index" in result_df.columns:
-            result_df = result_df.sort_values(by="Fire Index").reset_index(drop=True)
+        if "Fire Index" in result_df.columns:
+            result_df = result_df.sort_values(by="Fire Index", kind="stable").reset_index(drop=True)
             # Convert to 1-based indices for display
             result_df["Fire Index"] = result_df["Fire Index"] + 1
         
-        return result_df
\ No newline at end of file
+        return result_df
+    
+    def _solve_groups_parallel(self, fires: FireTable, 
+                               scenario_sets: List[List[int]], 
+                               workers: int) -> List[pd.DataFrame]:
+        """Solve scenario groups in a process pool, returning frames in group order."""
+        tasks = [(group, fires.take(group)) for group in scenario_sets]
+        workers = min(workers, len(tasks))
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_scenario_worker) as pool:
+            return list(pool.map(solve_scenario_task, tasks, chunksize=chunksize))
+    
+    def _solve_groups_batched(self, fires: FireTable, 
+                              scenario_sets: List[List[int]], 
+                              batch_groups: int, 
+                              workers: int = 1) -> List[pd.DataFrame]:
+        """Solve scenario groups batch_groups at a time in block-diagonal models, in group order."""
+        batches = [
+            [(group, fires.take(group)) for group in scenario_sets[start:start + batch_groups]]
+            for start in range(0, len(scenario_sets), batch_groups)
+        ]
+        if workers > 1 and len(batches) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(batches)), 
+                                     initializer=init_scenario_worker) as pool:
+                results = list(pool.map(solve_batch_task, batches))
+        else:
+            water_pts = DataLoader.load_water_sources()
+            results = [solve_scenario_batch(self.optimizer, water_pts, batch) for batch in batches]
+        return [df for batch_result in results for df in batch_result]
@@ -0,0 +1,193 @@
+"""
+Columnar fire, helipad and fleet tables shared by the loaders, dispatchers and optimizer.
+"""
+
+from typing import Dict, Any, Iterator, Sequence, Union
+import numpy as np
+import pandas as pd
+
+# Format of the date + time columns in fire records
+FIRE_TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+# Fires as a FireTable, a fireinfo DataFrame or a list of fire dicts
+Fires = Union["FireTable", pd.DataFrame, Sequence[Dict[str, Any]]]
+
+
+class FireTable:
+    """Fire incidents stored as parallel NumPy columns.
+
+    Indexing with an int returns the fire as a dict (name, lat, lng, date,
+    time, intensity, timestamp), so code written against lists of fire
+    dicts keeps working; array code should use the columns directly.
+    """
+
+    __slots__ = ('name', 'lat', 'lng', 'intensity', 'timestamp')
+
+    def __init__(self, name, lat, lng, intensity, timestamp=None):
+        """Create a table from column sequences of equal length."""
+        self.name = np.asarray(name, dtype=object)
+        self.lat = np.asarray(lat, dtype=float)
+        self.lng = np.asarray(lng, dtype=float)
+        self.intensity = np.asarray(intensity, dtype=int)
+        if timestamp is None:
+            timestamp = np.full(len(self.name), np.datetime64('NaT'))
+        self.timestamp = np.asarray(timestamp, dtype='datetime64[s]')
+
+    @classmethod
+    def empty(cls) -> "FireTable":
+        """Table without fires."""
+        return cls([], [], [], [])
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "FireTable":
+        """Build from a fireinfo DataFrame, parsing date + time unless 'timestamp' is present."""
+        if 'timestamp' in df.columns:
+            timestamp = df['timestamp'].to_numpy(dtype='datetime64[s]')
+        else:
+            timestamp = pd.to_datetime(df['date'] + " " + df['time'],
+                                       format=FIRE_TIME_FORMAT).to_numpy(dtype='datetime64[s]')
+        return cls(df['name'].to_numpy(dtype=object), df['lat'].to_numpy(dtype=float),
+                   df['lng'].to_numpy(dtype=float), df['intensity'].to_numpy(dtype=int), timestamp)
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> "FireTable":
+        """Build from fire dicts; date/time (or timestamp) are optional."""
+        stamps = []
+        for f in records:
+            if f.get('timestamp') is not None:
+                stamps.append(pd.Timestamp(f['timestamp']))
+            elif 'date' in f and 'time' in f:
+                stamps.append(f['date'] + " " + f['time'])
+            else:
+                stamps.append(None)
+        timestamp = pd.to_datetime(pd.Series(stamps, dtype=object), format=FIRE_TIME_FORMAT)
+        return cls([f['name'] for f in records], [f['lat'] for f in records],
+                   [f['lng'] for f in records], [f.get('intensity', 0) for f in records],
+                   timestamp.to_numpy(dtype='datetime64[s]'))
+
+    @classmethod
+    def coerce(cls, fires: Fires) -> "FireTable":
+        """Return fires as a FireTable, converting a DataFrame or list of fire dicts if needed."""
+        if isinstance(fires, cls):
+            return fires
+        if isinstance(fires, pd.DataFrame):
+            return cls.from_frame(fires)
+        return cls.from_records(fires)
+
+    @classmethod
+    def concat(cls, tables: Sequence["FireTable"]) -> "FireTable":
+        """Stack tables in order."""
+        if not tables:
+            return cls.empty()
+        return cls(*(np.concatenate([getattr(t, col) for t in tables]) for col in cls.__slots__))
+
+    def __len__(self) -> int:
+        return len(self.name)
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        """Fire i as a dict."""
+        record = {
+            'name': self.name[i],
+            'lat': float(self.lat[i]),
+            'lng': float(self.lng[i]),
+            'intensity': int(self.intensity[i]),
+        }
+        if not np.isnat(self.timestamp[i]):
+            ts = pd.Timestamp(self.timestamp[i])
+            record.update(date=ts.strftime("%Y-%m-%d"), time=ts.strftime("%H:%M"), timestamp=ts)
+        return record
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def coords(self) -> np.ndarray:
+        """(n, 2) array of (lat, lng)."""
+        return np.column_stack([self.lat, self.lng])
+
+    def take(self, indices: Sequence[int]) -> "FireTable":
+        """Sub-table of the given rows, in the given order."""
+        indices = np.asarray(indices, dtype=int)
+        return FireTable(*(getattr(self, col)[indices] for col in self.__slots__))
+
+
+class Helipads:
+    """Helipads stored as parallel NumPy columns; row i is base index i."""
+
+    __slots__ = ('lat', 'lng', 'name')
+
+    def __init__(self, lat, lng, name):
+        """Create a table from column sequences of equal length."""
+        self.lat = np.asarray(lat, dtype=float)
+        self.lng = np.asarray(lng, dtype=float)
+        self.name = np.asarray(name, dtype=object)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "Helipads":
+        """Build from a helipads DataFrame (lat, lng, name)."""
+        return cls(df['lat'].to_numpy(dtype=float), df['lng'].to_numpy(dtype=float),
+                   df['name'].to_numpy(dtype=object))
+
+    def __len__(self) -> int:
+        return len(self.name)
+
+    def __getitem__(self, i: int):
+        """Helipad i as a (lat, lng, name) tuple."""
+        return float(self.lat[i]), float(self.lng[i]), self.name[i]
+
+    @property
+    def coords(self) -> np.ndarray:
+        """(n, 2) array of (lat, lng)."""
+        return np.column_stack([self.lat, self.lng])
+
+
+class Fleet:
+    """Airframes stored as parallel NumPy columns, one row per helicopter."""
+
+    __slots__ = ('base', 'base_name', 'lat', 'lng', 'model', 'model_name', 'status',
+                 'speed_w1', 'speed_w2', 'efficiency', 'load_capa', 'time_limit', 'supp_capa')
+
+    # Per-model specification columns copied from heli_specs.csv
+    SPEC_COLUMNS = ('speed_w1', 'speed_w2', 'efficiency', 'load_capa', 'time_limit', 'supp_capa')
+
+    def __init__(self, **columns):
+        """Create a fleet from one array per slot."""
+        for col in self.__slots__:
+            setattr(self, col, np.asarray(columns[col]))
+
+    @classmethod
+    def from_frame(cls, heli_df: pd.DataFrame, helipads: Helipads) -> "Fleet":
+        """Build from the merged set_helis/heli_specs frame and the helipad table.
+
+        Raises ValueError if an airframe refers to a base missing from helipads.
+        """
+        base = heli_df['base'].to_numpy(dtype=int)
+        invalid = (base < 0) | (base >= len(helipads))
+        if invalid.any():
+            raise ValueError(f"Invalid base index {base[invalid][0]}")
+
+        columns = {col: heli_df[col].to_numpy(dtype=float) for col in cls.SPEC_COLUMNS}
+        status = heli_df['status'] if 'status' in heli_df.columns else pd.Series(1, index=heli_df.index)
+        return cls(
+            base=base,
+            base_name=helipads.name[base],
+            lat=helipads.lat[base],
+            lng=helipads.lng[base],
+            model=heli_df['model'].to_numpy(dtype=int),
+            model_name=heli_df['model_nm'].to_numpy(dtype=object),
+            status=status.to_numpy(dtype=int),
+            **columns
+        )
+
+    @classmethod
+    def empty(cls) -> "Fleet":
+        """Fleet without airframes."""
+        return cls(**{col: [] for col in cls.__slots__})
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+    @property
+    def coords(self) -> np.ndarray:
+        """(n, 2) array of each airframe's base (lat, lng)."""
+        return np.column_stack([self.lat, self.lng])
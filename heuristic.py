@@ -0,0 +1,185 @@
+"""
+Greedy NumPy dispatch heuristic used as a fast path and MILP warm start.
+"""
+
+from typing import List, Optional, Tuple
+import numpy as np
+
+# Tolerance when comparing suppression capacity against fire difficulty
+CAPACITY_TOL = 1e-9
+
+
+class HeuristicSolution:
+    """Assignment produced by GreedyHeuristic, parsed like a solved model."""
+
+    def __init__(self, assigned: List[Tuple[int, int]], fire_on: np.ndarray,
+                 objective: float, lower_bound: float):
+        self.assigned = assigned          # (helicopter, fire) pairs
+        self.fire_on = fire_on            # fires being addressed
+        self.objective = objective
+        self.lower_bound = lower_bound
+
+    @property
+    def is_optimal(self) -> bool:
+        """True when the objective meets the lower bound, i.e. the MILP cannot do better."""
+        return self.objective <= self.lower_bound + 1e-6 * max(1.0, abs(self.lower_bound))
+
+
+class GreedyHeuristic:
+    """Cost-ordered greedy assignment for the dispatch MILP.
+
+    Works on the same data as PyomoOptimizer.build_model: a (helicopter x fire)
+    cost matrix, the feasible pair mask (golden time, time limit, range),
+    suppression capacities and fire difficulties. The objective is the MILP's:
+    assigned costs plus big_penalty for every fire left unaddressed.
+    """
+
+    # Branch-and-bound node budget per covering problem before falling back
+    # to the greedy cover / fractional bound
+    NODE_LIMIT = 20000
+
+    @staticmethod
+    def _exact_cover(cost: np.ndarray, capa: np.ndarray, demand: float,
+                     node_limit: int) -> Tuple[Optional[np.ndarray], float, float]:
+        """Min-cost subset of items whose capacity covers demand.
+
+        Identical (cost, capacity) items are branched on as one type with a
+        count. Returns (items or None, cost, lower bound); items is None when
+        the node budget ran out, in which case the bound is the LP relaxation.
+        """
+        types = {}
+        for i, key in enumerate(zip(cost.tolist(), capa.tolist())):
+            types.setdefault(key, []).append(i)
+        keys = sorted(types, key=lambda k: k[0] / k[1])   # cost per unit of capacity
+        t_cost = np.array([k[0] for k in keys])
+        t_capa = np.array([k[1] for k in keys])
+        t_count = np.array([len(types[k]) for k in keys])
+
+        def relaxation(start: int, need: float) -> float:
+            """LP bound for covering `need` with types from `start` on."""
+            total = 0.0
+            for t in range(start, len(keys)):
+                if need <= CAPACITY_TOL:
+                    return total
+                take = min(t_count[t], need / t_capa[t])
+                total += take * t_cost[t]
+                need -= take * t_capa[t]
+            return total if need <= CAPACITY_TOL else np.inf
+
+        root_bound = relaxation(0, demand)
+        best_cost, best_counts = np.inf, None
+        nodes = 0
+        stack = [(0, demand, 0.0, ())]
+        while stack:
+            nodes += 1
+            if nodes > node_limit:
+                return None, best_cost, root_bound
+            t, need, spent, counts = stack.pop()
+            if need <= CAPACITY_TOL:
+                if spent < best_cost:
+                    best_cost, best_counts = spent, counts
+                continue
+            if t == len(keys) or spent + relaxation(t, need) >= best_cost - 1e-12:
+                continue
+            max_take = min(t_count[t], int(np.ceil(need / t_capa[t] - CAPACITY_TOL)))
+            # Push fewer-first so the greedy "take as many as useful" branch is explored first
+            for take in range(0, max_take + 1):
+                stack.append((t + 1, need - take * t_capa[t], spent + take * t_cost[t],
+                              counts + (take,)))
+
+        if best_counts is None:
+            return None, np.inf, np.inf
+        items = [i for key, take in zip(keys, best_counts) for i in types[key][:take]]
+        return np.array(items, dtype=int), best_cost, best_cost
+
+    @staticmethod
+    def _cover(cost: np.ndarray, candidates: np.ndarray, supp_capa: np.ndarray,
+               demand: float) -> Optional[Tuple[np.ndarray, float]]:
+        """Cheapest set of candidate helicopters whose capacity covers demand, or None."""
+        cand = np.nonzero(candidates & (supp_capa > 0))[0]
+        if supp_capa[cand].sum() < demand - CAPACITY_TOL:
+            return None
+
+        items, exact_cost, _ = GreedyHeuristic._exact_cover(
+            cost[cand], supp_capa[cand], demand, GreedyHeuristic.NODE_LIMIT
+        )
+        if items is not None:
+            return cand[items], exact_cost
+
+        # Node budget exhausted: fill by cost per unit of capacity, then drop
+        # helicopters that became redundant
+        order = cand[np.argsort(cost[cand] / supp_capa[cand], kind='stable')]
+        cum = np.cumsum(supp_capa[order])
+        chosen = list(order[:np.searchsorted(cum, demand - CAPACITY_TOL) + 1])
+        total = supp_capa[chosen].sum()
+        for h in sorted(chosen, key=lambda h: -cost[h]):
+            if total - supp_capa[h] >= demand - CAPACITY_TOL:
+                chosen.remove(h)
+                total -= supp_capa[h]
+        chosen = np.array(chosen, dtype=int)
+        return chosen, float(cost[chosen].sum())
+
+    @staticmethod
+    def lower_bound(cost: np.ndarray, feasible: np.ndarray, supp_capa: np.ndarray,
+                    difficulties: np.ndarray, big_penalty: float) -> float:
+        """Lower bound on the MILP objective.
+
+        Each fire is covered independently (helicopters may be shared), exactly
+        when the branch-and-bound finishes and by the LP relaxation otherwise,
+        capped at big_penalty.
+        """
+        bound = 0.0
+        for f, demand in enumerate(difficulties):
+            if demand <= 0:
+                continue
+            cand = np.nonzero(feasible[:, f] & (supp_capa > 0))[0]
+            if supp_capa[cand].sum() < demand - CAPACITY_TOL:
+                bound += big_penalty
+                continue
+            _, _, fire_bound = GreedyHeuristic._exact_cover(
+                cost[cand, f], supp_capa[cand], demand, GreedyHeuristic.NODE_LIMIT
+            )
+            bound += min(big_penalty, fire_bound)
+        return bound
+
+    @staticmethod
+    def solve(cost: np.ndarray, feasible: np.ndarray, supp_capa: np.ndarray,
+              difficulties, big_penalty: float) -> HeuristicSolution:
+        """Greedily serve the fire with the largest saving over its penalty, repeatedly."""
+        cost = np.asarray(cost, dtype=float)
+        feasible = np.asarray(feasible, dtype=bool)
+        supp_capa = np.asarray(supp_capa, dtype=float)
+        difficulties = np.asarray(difficulties, dtype=float)
+        num_helis = cost.shape[0]
+
+        available = np.ones(num_helis, dtype=bool)
+        fire_on = difficulties <= 0                      # no demand: addressed for free
+        assigned = []
+        objective = 0.0
+        remaining = set(np.nonzero(~fire_on)[0].tolist())
+
+        while remaining:
+            best_fire, best_cover, best_saving = None, None, 0.0
+            for f in sorted(remaining):
+                cover = GreedyHeuristic._cover(cost[:, f], available & feasible[:, f],
+                                               supp_capa, difficulties[f])
+                if cover is None:
+                    continue
+                saving = big_penalty - cover[1]
+                if saving > best_saving:
+                    best_fire, best_cover, best_saving = f, cover, saving
+            if best_fire is None:
+                break
+
+            helis, fire_cost = best_cover
+            available[helis] = False
+            fire_on[best_fire] = True
+            assigned.extend((int(h), best_fire) for h in helis)
+            objective += fire_cost
+            remaining.discard(best_fire)
+
+        objective += big_penalty * len(remaining)
+        assigned.sort()
+
+        bound = GreedyHeuristic.lower_bound(cost, feasible, supp_capa, difficulties, big_penalty)
+        return HeuristicSolution(assigned, fire_on, objective, bound)
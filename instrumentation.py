@@ -0,0 +1,120 @@
+"""
+Opt-in instrumentation: per-stage timers and counters written as JSON lines.
+"""
+
+import os
+import json
+import time
+import functools
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+from utils import config
+
+
+class Instrumentation:
+    """Collects timers, counters and model statistics per scenario.
+
+    Disabled unless instrumentation.enabled is set in config.json, in which
+    case every hook is a cheap no-op. While a scenario is open, timers
+    accumulate into its record, which is appended to the output file as one
+    JSON line when the scenario ends; timers used outside a scenario (e.g.
+    data loading) are written as records of their own. With profile_dir set,
+    each scenario is also run under cProfile and the stats are dumped there.
+    """
+
+    def __init__(self, params: Optional[Dict[str, Any]] = None):
+        """Read settings from config unless given."""
+        params = config.get_instrumentation_params() if params is None else params
+        self.enabled = params.get('enabled', False)
+        self.output = params.get('output', 'instrumentation.jsonl')
+        self.profile_dir = params.get('profile_dir')
+        self._record: Optional[Dict[str, Any]] = None
+        self._num_scenarios = 0
+
+    def _emit(self, record: Dict[str, Any]):
+        """Append one record to the JSON lines output."""
+        record.update(pid=os.getpid(), timestamp=round(time.time(), 3))
+        directory = os.path.dirname(self.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.output, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    @contextmanager
+    def timer(self, name: str):
+        """Time the enclosed block as stage `name`."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if self._record is not None:
+                timers = self._record['timers']
+                timers[name] = timers.get(name, 0.0) + elapsed
+            else:
+                self._emit({'event': name, 'wall_s': round(elapsed, 6)})
+
+    def timed(self, name: str):
+        """Decorator form of timer(); the enabled flag is checked on every call."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.timer(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name: str, n: int = 1):
+        """Add n to a counter of the open scenario."""
+        if self.enabled and self._record is not None:
+            counters = self._record['counters']
+            counters[name] = counters.get(name, 0) + int(n)
+
+    def add_model(self, **stats):
+        """Record one model solved in the open scenario (size, status, phase timings)."""
+        if self.enabled and self._record is not None:
+            self._record['models'].append(
+                {k: round(v, 6) if isinstance(v, float) else v for k, v in stats.items()}
+            )
+
+    @contextmanager
+    def scenario(self, **fields):
+        """Collect everything inside the block into one scenario record."""
+        if not self.enabled:
+            yield
+            return
+
+        record = {'event': 'scenario', 'scenario': self._num_scenarios, **fields,
+                  'timers': {}, 'counters': {}, 'models': []}
+        self._record = record
+        profiler = None
+        if self.profile_dir:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record['wall_s'] = round(time.perf_counter() - start, 6)
+            if profiler is not None:
+                profiler.disable()
+                os.makedirs(self.profile_dir, exist_ok=True)
+                path = os.path.join(self.profile_dir,
+                                    f"scenario-{os.getpid()}-{self._num_scenarios}.prof")
+                profiler.dump_stats(path)
+                record['profile'] = path
+            record['timers'] = {k: round(v, 6) for k, v in record['timers'].items()}
+            self._record = None
+            self._num_scenarios += 1
+            self._emit(record)
+
+
+# Global instrumentation instance
+instrumentation = Instrumentation()
@@ -12,12 +12,18 @@ Dependencies:
 """
 
 import sys
+import argparse
 from data_loader import DataLoader
 from dispatcher import WildfireDispatcher
 
 
 def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Wildfire helicopter dispatch")
+    parser.add_argument("--mode", choices=["basic", "optimized", "both"], default="both",
+                        help="dispatch logic to run (basic skips loading Pyomo and the solver)")
+    args = parser.parse_args()
+    
     # Check if required CSV files exist
     print("Checking required CSV files...")
     
@@ -34,20 +40,22 @@ def main():
     dispatcher = WildfireDispatcher()
     
     # Test basic dispatch logic
-    print("\n=== Basic Dispatch Result ===")
-    df_basic = dispatcher.dispatch_basic(fire_data)
-    if not df_basic.empty:
-        print(df_basic)
-    else:
-        print("No Basic Dispatch Result")
+    if args.mode in ("basic", "both"):
+        print("\n=== Basic Dispatch Result ===")
+        df_basic = dispatcher.dispatch_basic(fire_data)
+        if not df_basic.empty:
+            print(df_basic)
+        else:
+            print("No Basic Dispatch Result")
     
     # Test optimization logic
-    print("\n=== Optimization Result ===")
-    df_opt = dispatcher.dispatch_optimized(fire_data)
-    if not df_opt.empty:
-        print(df_opt)
-    else:
-        print("No Optimization Result")
+    if args.mode in ("optimized", "both"):
+        print("\n=== Optimization Result ===")
+        df_opt = dispatcher.dispatch_optimized(fire_data)
+        if not df_opt.empty:
+            print(df_opt)
+        else:
+            print("No Optimization Result")
     
     print("\n=== Done ===")
 
@@ -0,0 +1,127 @@
+"""
+Monte Carlo replication of the proximity-based (basic) dispatcher.
+
+BasicDispatcher draws one helicopter need per fire under a single seed, so a
+run is one sample path. Here the needs of many replications are drawn up
+front from NumPy Generator streams, one SeedSequence child per chunk of
+replications, so results depend on the seed but not on the number of
+workers. Each chunk is allocated in one pass over the fires with
+BasicDispatcher.allocate, and the chunks run in parallel. The report gives
+distributions of the unserved-fire rate, the "추가파견불가" (not enough
+helicopters left) frequency and the helicopters sent per base.
+
+Usage:
+    python monte_carlo.py --replications 10000 --workers 4
+    python monte_carlo.py --replications 2000 --seed 7 --output mc.csv
+"""
+
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Tuple, Optional
+import numpy as np
+import pandas as pd
+
+from utils import config
+from data_loader import DataLoader
+from dispatcher import BasicDispatcher
+from fleet import FireTable
+
+# Replications drawn and allocated together in one task
+CHUNK_SIZE = 500
+
+# Percentiles reported for every distribution
+PERCENTILES = [0.05, 0.5, 0.95]
+
+
+def simulate_chunk(task: Tuple[np.random.SeedSequence, int, np.ndarray, np.ndarray, np.ndarray,
+                               Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Draw needs for `size` replications and allocate them; returns per-replication outcomes."""
+    seed_seq, size, ranking, in_range, capacity, fire_needs = task
+    rng = np.random.default_rng(seed_seq)
+    weights = np.asarray(fire_needs['weights'], dtype=float)
+    needs = rng.choice(fire_needs['options'], size=(size, len(ranking)), p=weights / weights.sum())
+
+    out_of_range = np.zeros(size, dtype=int)
+    not_enough = np.zeros(size, dtype=int)
+    sent_by_base = np.zeros((size, len(capacity)), dtype=int)
+    for _, near_heli, served, to_send in BasicDispatcher.allocate(ranking, in_range, capacity, needs):
+        if near_heli.size == 0:
+            out_of_range += 1
+            continue
+        not_enough += ~served
+        sent_by_base[:, near_heli] += to_send
+    return {'out_of_range': out_of_range, 'not_enough': not_enough, 'sent_by_base': sent_by_base}
+
+
+def run_replications(fires: FireTable, helicopters_df: pd.DataFrame, replications: int,
+                     seed: Optional[int] = None, workers: int = 1,
+                     chunk_size: int = CHUNK_SIZE) -> pd.DataFrame:
+    """Run the basic dispatcher over many replications; one row per replication.
+
+    Columns: unserved_rate, not_enough_rate (추가파견불가), out_of_range_rate,
+    helicopters_sent and one 'sent: <base>' column per helipad.
+    """
+    if seed is None:
+        seed = config.get_simulation_params()['random_seed']
+    fire_needs = config.get_simulation_params()['fire_helicopter_needs']
+    ranking, in_range = BasicDispatcher.rank_helipads(fires, helicopters_df)
+    capacity = helicopters_df['helicopters'].to_numpy(dtype=int)
+
+    sizes = [min(chunk_size, replications - start) for start in range(0, replications, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(seed_seq, size, ranking, in_range, capacity, fire_needs)
+             for seed_seq, size in zip(seeds, sizes)]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            chunks = list(pool.map(simulate_chunk, tasks))
+    else:
+        chunks = [simulate_chunk(task) for task in tasks]
+
+    out_of_range = np.concatenate([c['out_of_range'] for c in chunks])
+    not_enough = np.concatenate([c['not_enough'] for c in chunks])
+    sent_by_base = np.concatenate([c['sent_by_base'] for c in chunks])
+    num_fires = len(fires)
+    result = pd.DataFrame({
+        'unserved_rate': (out_of_range + not_enough) / num_fires,
+        'not_enough_rate': not_enough / num_fires,
+        'out_of_range_rate': out_of_range / num_fires,
+        'helicopters_sent': sent_by_base.sum(axis=1),
+    })
+    sent = pd.DataFrame(sent_by_base, columns=[f"sent: {name}" for name in helicopters_df['name']])
+    return pd.concat([result, sent], axis=1).rename_axis('replication')
+
+
+def summarize(replications_df: pd.DataFrame) -> pd.DataFrame:
+    """Distribution summary (mean, std, percentiles, min, max) of every column."""
+    return replications_df.describe(percentiles=PERCENTILES).T.drop(columns='count')
+
+
+def main():
+    """Run the replications and print the distribution summary."""
+    parser = argparse.ArgumentParser(description="Monte Carlo replication of the basic dispatcher")
+    parser.add_argument("--replications", type=int, default=1000)
+    parser.add_argument("--seed", type=int, help="root seed (default: simulation.random_seed)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--output", help="per-replication results CSV")
+    args = parser.parse_args()
+
+    fires = DataLoader.load_fires()
+    helicopters_df = DataLoader.load_helicopters()
+    if not fires or helicopters_df.empty:
+        print("Error: Fire or helicopter data not available")
+        return
+
+    replications_df = run_replications(fires, helicopters_df, args.replications, seed=args.seed,
+                                       workers=args.workers, chunk_size=args.chunk_size)
+    print(f"{args.replications} replications over {len(fires)} fires")
+    with pd.option_context('display.float_format', '{:.4f}'.format, 'display.width', 120):
+        print(summarize(replications_df))
+    if args.output:
+        replications_df.to_csv(args.output)
+        print(f"Replications written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
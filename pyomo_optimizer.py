@@ -2,83 +2,149 @@
 Pyomo-based optimizer for wildfire helicopter dispatch.
 """
 
-from typing import List, Tuple, Optional
+import time
+import math
+from typing import List, Tuple, Optional, Dict, Union
+import numpy as np
 import pandas as pd
 from pyomo.environ import *
 
-from utils import config
+from utils import config, GeoUtils, Coords, IN_PROCESS_SOLVERS
 from data_loader import DataLoader
+from heuristic import GreedyHeuristic, HeuristicSolution
+from fleet import Fleet
+from instrumentation import instrumentation
+
+def _timed(func, timing: Dict[str, float], key: str):
+    """Wrap func so its wall time is accumulated into timing[key]."""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timing[key] += time.perf_counter() - start
+    return wrapper
+
+
+class BlockSolution:
+    """Assignment of one block of a batch model (see PyomoOptimizer.solve_batch)."""
+    
+    def __init__(self, assigned: List[Tuple[int, int]]):
+        self.assigned = assigned  # (helicopter, fire) pairs within the block
+
 
 class PyomoOptimizer:
     """Implements optimization-based helicopter dispatch using Pyomo."""
     
-    def __init__(self):
-        """Initialize the optimizer."""
+    def __init__(self, base_water_dist: Optional[np.ndarray] = None):
+        """Initialize the optimizer.
+        
+        base_water_dist optionally supplies the helipad x water source distance
+        matrix instead of DataLoader.load_base_water_distances().
+        """
         self.heli_df = DataLoader.load_detailed_helicopters()
         self.helipads = DataLoader.load_helipads()
         self.opt_params = config.get_optimization_params()
         
-        # Initialize model parameters
-        self.speed_w1 = []
-        self.speed_w2 = []
-        self.efficiency = []
-        self.load_capa = []
-        self.time_limit = []
-        self.supp_capa = []
-        self.heli_locs = []
+        # Airframe parameters and base locations (one row per airframe)
+        self.fleet = Fleet.empty()
+        
+        # Distinct helibases and (base, model) pairs, with airframe -> group maps
+        self.base_ids = np.empty(0, dtype=int)
+        self.base_locs = np.empty((0, 2))
+        self.heli_base_pos = np.empty(0, dtype=int)
+        self.kin_rep = np.empty(0, dtype=int)
+        self.heli_kin_pos = np.empty(0, dtype=int)
+        self.base_water_dist = None
+        
+        # Solver instance (created on first solve) and per-scenario timing split
+        self._solver = None
+        self._template = None
+        self.last_timing: Dict[str, float] = {}
         
         # Initialize if data is available
         if not self.heli_df.empty and self.helipads:
-            self._init_parameters()
+            self._init_parameters(base_water_dist)
         else:
             print("Warning: Cannot initialize PyomoOptimizer - missing helicopter or helipad data")
             
-    def _init_parameters(self):
+    def _init_parameters(self, base_water_dist: Optional[np.ndarray] = None):
         """Initialize parameters from helicopter data."""
-        self.speed_w1 = list(self.heli_df.speed_w1)
-        self.speed_w2 = list(self.heli_df.speed_w2)
-        self.efficiency = list(self.heli_df.efficiency)
-        self.load_capa = list(self.heli_df.load_capa)
-        self.time_limit = list(self.heli_df.time_limit)
-        self.supp_capa = list(self.heli_df.supp_capa)
-        
-        # Map base index to coordinates from loaded helipads
-        self.heli_locs = []
-        for base_idx in self.heli_df["base"]:
-            if 0 <= base_idx < len(self.helipads):
-                self.heli_locs.append((self.helipads[base_idx][0], self.helipads[base_idx][1]))
-            else:
-                print(f"Warning: Invalid base index {base_idx}")
-                return  # Stop initialization if invalid base index
+        try:
+            self.fleet = Fleet.from_frame(self.heli_df, self.helipads)
+        except ValueError as e:
+            print(f"Warning: {e}")
+            return  # Stop initialization if invalid base index
+        
+        # Geometry is shared by all airframes at a base
+        self.base_ids, self.heli_base_pos = np.unique(self.fleet.base, return_inverse=True)
+        self.base_locs = self.helipads.coords[self.base_ids]
+        
+        # Kinematics are shared by all airframes of one model at one base
+        kin_keys = np.column_stack([self.heli_base_pos, self.fleet.model])
+        _, self.kin_rep, self.heli_kin_pos = np.unique(
+            kin_keys, axis=0, return_index=True, return_inverse=True
+        )
+        self.heli_kin_pos = self.heli_kin_pos.reshape(-1)
+        
+        # Base -> water distances, looked up from the precomputed helipad table
+        if base_water_dist is None:
+            base_water_dist = DataLoader.load_base_water_distances()
+        if base_water_dist.shape[1] > 0:
+            self.base_water_dist = base_water_dist[self.base_ids]
+    
+    def compute_distances(self, fire_coords: Coords, 
+                          water_pts: Coords) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """Compute (airframe x fire) d1/d2/d3 once per base and broadcast to airframes.
+        
+        The fourth item holds the legs' (3, airframe, fire) travel time factors,
+        or None when travel time is distance / speed (see travel_time.py).
+        """
+        with instrumentation.timer('water_sources'):
+            d1, d2, d3, factors = GeoUtils.find_optimal_water_sources(
+                fire_coords, water_pts, self.base_locs, heli_water_dist=self.base_water_dist
+            )
+        if len(d1) == 0:
+            return d1, d2, d3, factors
+        pos = self.heli_base_pos
+        return d1[pos], d2[pos], d3[pos], None if factors is None else factors[:, pos]
 
     def objective_rule(self, model):
         """Objective function: minimize cost + penalty for unaddressed fires"""
         return (
-            sum(model.cost_hf[h, f] * model.AssignFire[h, f] for h in model.H for f in model.F) +
-            sum(self.opt_params['big_penalty'] * (1 - model.FireOn[f]) for f in model.F)
+            sum(model.cost_hf[h, f] * model.AssignFire[h, f] for h, f in model.AssignFire) +
+            sum(model.big_penalty * (1 - model.FireOn[f]) for f in model.F)
         )
     
-    def golden_time_rule(self, model, h, f):
-        """Constraint 1: Golden time (arrival within configured minutes)"""
-        if model.arrival_time_hf[h, f] > self.opt_params['golden_time_minutes']:
-            return model.Assign[h, f] == 0
-        return Constraint.Skip
-    
-    def time_limit_rule(self, model, h, f):
-        """Constraint 2: Helicopter time limit"""
-        if model.time_hf[h, f] > model.TIME_LIMIT[h]:
-            return model.Assign[h, f] == 0
-        return Constraint.Skip
+    def feasible_pairs(self, d3, time_hf, arrival_time_hf, 
+                       available: Optional[np.ndarray] = None) -> np.ndarray:
+        """Boolean (airframe x fire) mask of assignable pairs.
+        
+        Replaces per-pair constraints with filters applied before the model is built:
+        golden time (arrival within configured minutes), helicopter time limit
+        and maximum helicopter range from base. Airframes not in the optional
+        available mask get no pairs.
+        """
+        feasible = (
+            (np.asarray(arrival_time_hf) <= self.opt_params['golden_time_minutes']) &
+            (np.asarray(time_hf) <= self.fleet.time_limit[:, None]) &
+            (np.asarray(d3) <= self.opt_params['max_helicopter_range_km'])
+        )
+        if available is not None:
+            feasible &= np.asarray(available, dtype=bool)[:, None]
+        return feasible
     
     def suppression_rule(self, model, f):
-        """Constraint 3: Fire suppression capacity"""
+        """Constraint 1: Fire suppression capacity"""
         return model.difficulties[f] * model.FireOn[f] <= sum(
-            model.SUPP_CAPA[h] * model.Assign[h, f] for h in model.H
+            model.SUPP_CAPA[h] * model.Assign[h, f] for h in model.H_f[f]
         )
     
     def one_assignment_rule(self, model, h):
-        """Constraint 4: One helicopter can address only one fire"""
-        return sum(model.Assign[h, f] for f in model.F) <= 1
+        """Constraint 2: One helicopter can address only one fire"""
+        if not model.F_h[h]:
+            return Constraint.Skip
+        return sum(model.Assign[h, f] for f in model.F_h[h]) <= 1
         
     def assignfire_upper_bound1(self, model, h, f):
         """Linearization constraint 1"""
@@ -92,65 +158,333 @@ class PyomoOptimizer:
         """Linearization constraint 3"""
         return model.AssignFire[h, f] >= model.Assign[h, f] + model.FireOn[f] - 1
 
-    def calculate_time_matrices(self, d1, d2, d3, fire_indices):
-        """Calculate time and cost matrices"""
-        time_hf_list = [[
-            (d1[h][f] / self.speed_w1[h]) + 
-            (d2[h][f] / self.speed_w2[h]) + 
-            (d3[h][f] / self.speed_w1[h])
-            for f in range(len(fire_indices))
-        ] for h in range(len(self.heli_locs))]
-        
-        cost_hf_list = [[
-            self.opt_params['fuel_rate'] * self.efficiency[h] * time_hf_list[h][f]
-            for f in range(len(fire_indices))
-        ] for h in range(len(self.heli_locs))]
-        
-        arrival_time_hf_list = [[
-            (d1[h][f] / self.speed_w1[h]) + (d2[h][f] / self.speed_w2[h])
-            for f in range(len(fire_indices))
-        ] for h in range(len(self.heli_locs))]
-        
-        return time_hf_list, cost_hf_list, arrival_time_hf_list
+    def calculate_time_matrices(self, d1, d2, d3, fire_indices, factors=None):
+        """Calculate time and cost matrices.
+        
+        d1/d2/d3 are (airframe x fire) matrices from compute_distances, so
+        airframes sharing a base and model share a row; each distinct
+        (base, model) pair is evaluated once and broadcast to its airframes.
+        factors optionally scales the three legs' flight times (see compute_distances).
+        """
+        rep = self.kin_rep
+        shape = (len(self.fleet), len(fire_indices))
+        d1 = np.asarray(d1, dtype=float).reshape(shape)[rep]
+        d2 = np.asarray(d2, dtype=float).reshape(shape)[rep]
+        d3 = np.asarray(d3, dtype=float).reshape(shape)[rep]
+        if factors is not None:
+            # Time-equivalent distances; the km values are still used for the range limit
+            f1, f2, f3 = np.asarray(factors, dtype=float).reshape((3,) + shape)[:, rep]
+            d1, d2, d3 = d1 * f1, d2 * f2, d3 * f3
+        speed_w1 = self.fleet.speed_w1[rep][:, None]
+        speed_w2 = self.fleet.speed_w2[rep][:, None]
+        
+        arrival_time = d1 / speed_w1 + d2 / speed_w2
+        time_hf = arrival_time + d3 / speed_w1
+        cost_hf = self.opt_params['fuel_rate'] * self.fleet.efficiency[rep][:, None] * time_hf
+        
+        kin = self.heli_kin_pos
+        return time_hf[kin], cost_hf[kin], arrival_time[kin]
+        
+    def reachable_pairs(self, d1, d2, d3, available: Optional[np.ndarray] = None,
+                        factors: Optional[np.ndarray] = None) -> np.ndarray:
+        """Feasible (airframe x fire) mask for a scenario, as applied by build_model."""
+        num_fires = np.shape(d3)[1]
+        time_hf, _, arrival_time_hf = self.calculate_time_matrices(d1, d2, d3, range(num_fires), factors)
+        return self.feasible_pairs(d3, time_hf, arrival_time_hf, available)
         
     def build_model(self, fire_indices: List[int], 
                     difficulties: List[int], 
                     d1: List[List[float]], 
                     d2: List[List[float]], 
-                    d3: List[List[float]]) -> Tuple[Optional[ConcreteModel], 
-                                                  List[List[float]], 
-                                                  List[List[float]]]:
-        """Build Pyomo optimization model."""
-        if not fire_indices or self.heli_df.empty or not self.heli_locs:
+                    d3: List[List[float]], 
+                    available: Optional[np.ndarray] = None,
+                    factors: Optional[np.ndarray] = None) -> Tuple[Optional[Union[ConcreteModel, HeuristicSolution]], 
+                                                                   List[List[float]], 
+                                                                   List[List[float]]]:
+        """Build Pyomo optimization model.
+        
+        available optionally masks airframes that may be assigned (e.g. not
+        busy on an earlier mission). factors optionally holds the legs' travel
+        time factors from compute_distances. With the heuristic enabled, a greedy
+        solution is computed first. It is returned instead of a model when it
+        is provably optimal or when the MILP exceeds heuristic.latency_budget_s,
+        and warm-starts the MILP otherwise.
+        """
+        if not fire_indices or not len(self.fleet):
             print("Cannot build optimization model: Missing required data")
             return None, None, None
+        
+        build_start = time.perf_counter()
+        time_hf_list, cost_hf_list, arrival_time_hf_list = self.calculate_time_matrices(
+            d1, d2, d3, fire_indices, factors
+        )
+        
+        # Only feasible (helicopter, fire) pairs can be assigned
+        feasible = self.feasible_pairs(d3, time_hf_list, arrival_time_hf_list, available)
+        
+        # Fast path: greedy heuristic
+        heuristic_params = config.get_heuristic_params()
+        heuristic = None
+        if heuristic_params.get('enabled', False):
+            heuristic = GreedyHeuristic.solve(
+                cost_hf_list, feasible, self.fleet.supp_capa, difficulties, self.opt_params['big_penalty']
+            )
+            if heuristic.is_optimal:
+                self.last_timing = {'heuristic': time.perf_counter() - build_start}
+                self._report_timing()
+                self._record_model(heuristic, 'heuristic_optimal', feasible.shape[1], int(feasible.sum()))
+                return heuristic, cost_hf_list, time_hf_list
+        
+        if config.get_solver_config().get('reuse_model', False):
+            model = self._update_template(difficulties, cost_hf_list, feasible)
+        else:
+            model = self._construct_model(difficulties, cost_hf_list, time_hf_list, feasible)
+        if heuristic is not None:
+            self._set_warm_start(model, heuristic)
+        
+        build_time = time.perf_counter() - build_start
+        
+        # Solve model
+        time_limit = heuristic_params.get('latency_budget_s') if heuristic else None
+        try:
+            solved = self.solve_model(
+                model, 
+                time_limit=time_limit, 
+                warm_start=heuristic is not None
+            )
+            self.last_timing = {'build': build_time, **self.last_timing}
+            self._report_timing()
+            
+            if not solved and heuristic is not None:
+                if time_limit is not None:
+                    print("[Pyomo] Latency budget exceeded; using heuristic solution.")
+                else:
+                    print("[Pyomo] Could not find optimal solution; using heuristic solution.")
+                self._record_model(model, 'heuristic_fallback', feasible.shape[1], int(feasible.sum()))
+                return heuristic, cost_hf_list, time_hf_list
+            
+            if not solved:
+                print("[Pyomo] Could not find optimal solution.")
+                self._record_model(model, 'not_solved', feasible.shape[1], int(feasible.sum()))
+                return None, None, None
             
+            self._record_model(model, 'optimal', feasible.shape[1], int(feasible.sum()))
+            return model, cost_hf_list, time_hf_list
+            
+        except Exception as e:
+            print(f"Error solving model: {e}")
+            self._record_model(model, 'error', feasible.shape[1], int(feasible.sum()))
+            return None, None, None
+    
+    def solve_batch(self, blocks: List[Tuple[List[int], List[int], np.ndarray, np.ndarray, np.ndarray,
+                                             Optional[np.ndarray]]]
+                    ) -> List[Tuple[Optional[Union[BlockSolution, HeuristicSolution]], 
+                                    Optional[np.ndarray], Optional[np.ndarray]]]:
+        """Solve independent blocks in one block-diagonal model with a single solver call.
+        
+        blocks are (fire_indices, difficulties, d1, d2, d3, factors) as passed to
+        build_model, e.g. the scenario groups of a season. Each block gets its
+        own copy of the fleet, so the stacked model separates into the blocks'
+        models and the solver process / model I/O is paid once. Returns
+        build_model's (solution, cost_hf, time_hf) per block.
+        
+        Branch-and-bound does not split the stacked model into its blocks, so
+        a batch can take far longer than its blocks alone. Only blocks with at
+        most solver.batch_max_block_pairs feasible pairs are stacked (the rest
+        go to build_model), and the batch solve is capped by
+        solver.batch_time_limit_s (and heuristic.latency_budget_s). With the
+        heuristic enabled, blocks it solves provably optimally are left out of
+        the model and the others warm-start it. If the batch is not solved
+        optimally, each block is solved alone by build_model, or falls back to
+        its heuristic solution when a latency budget is set.
+        """
+        results = [(None, None, None)] * len(blocks)
+        if not blocks or not len(self.fleet):
+            return results
+        
+        build_start = time.perf_counter()
+        solver_config = config.get_solver_config()
+        max_block_pairs = solver_config.get('batch_max_block_pairs', 50)
+        heuristic_params = config.get_heuristic_params()
+        use_heuristic = heuristic_params.get('enabled', False)
+        stacked, alone = [], []
+        for b, (fire_indices, difficulties, d1, d2, d3, factors) in enumerate(blocks):
+            time_hf, cost_hf, arrival_time_hf = self.calculate_time_matrices(d1, d2, d3, fire_indices, factors)
+            feasible = self.feasible_pairs(d3, time_hf, arrival_time_hf)
+            if max_block_pairs is not None and feasible.sum() > max_block_pairs:
+                alone.append(b)
+                continue
+            heuristic = None
+            if use_heuristic:
+                heuristic = GreedyHeuristic.solve(
+                    cost_hf, feasible, self.fleet.supp_capa, difficulties, self.opt_params['big_penalty']
+                )
+                if heuristic.is_optimal:
+                    results[b] = (heuristic, cost_hf, time_hf)
+                    continue
+            stacked.append((b, difficulties, cost_hf, time_hf, feasible, heuristic))
+        if len(stacked) == 1:
+            # Nothing to batch with
+            alone.append(stacked.pop()[0])
+        for b in alone:
+            fire_indices, difficulties, d1, d2, d3, factors = blocks[b]
+            results[b] = self.build_model(fire_indices, difficulties, d1, d2, d3, factors=factors)
+        if not stacked:
+            return results
+        
+        # Block k uses helicopter rows k*H .. (k+1)*H - 1 and its own run of fire columns
+        num_helis = len(self.fleet)
+        fire_offsets = np.cumsum([0] + [len(entry[1]) for entry in stacked])
+        heli_idx, fire_idx, costs, times = [], [], [], []
+        for k, (_, _, cost_hf, time_hf, feasible, _) in enumerate(stacked):
+            h, f = np.nonzero(feasible)
+            heli_idx.append(h + k * num_helis)
+            fire_idx.append(f + fire_offsets[k])
+            costs.append(cost_hf[h, f])
+            times.append(time_hf[h, f])
+        model = self._construct_sparse_model(
+            [d for entry in stacked for d in entry[1]],
+            np.concatenate(heli_idx), np.concatenate(fire_idx), np.concatenate(costs), np.concatenate(times),
+            heli_rows=np.tile(np.arange(num_helis), len(stacked))
+        )
+        if use_heuristic:
+            self._set_warm_start(model, self._stack_heuristics(
+                [entry[5] for entry in stacked], num_helis, fire_offsets
+            ))
+        build_time = time.perf_counter() - build_start
+        num_pairs = sum(len(h) for h in heli_idx)
+        
+        limits = [solver_config.get('batch_time_limit_s', 2)]
+        if use_heuristic:
+            limits.append(heuristic_params.get('latency_budget_s'))
+        limits = [limit for limit in limits if limit is not None]
+        time_limit = min(limits) if limits else None
+        # Within a latency budget there is no time left to solve the blocks alone
+        use_heuristic_solutions = use_heuristic and heuristic_params.get('latency_budget_s') is not None
+        try:
+            solved = self.solve_model(model, time_limit=time_limit, warm_start=use_heuristic)
+        except Exception as e:
+            print(f"Error solving model: {e}")
+            self._record_model(model, 'error', int(fire_offsets[-1]), num_pairs)
+            return self._solve_blocks_alone(blocks, stacked, results, use_heuristic_solutions)
+        self.last_timing = {'build': build_time, **self.last_timing}
+        self._report_timing()
+        if not solved:
+            if time_limit is not None:
+                print("[Pyomo] Time limit exceeded for the batch; falling back per block.")
+            else:
+                print("[Pyomo] Could not find optimal solution for the batch; falling back per block.")
+            self._record_model(model, 'not_solved', int(fire_offsets[-1]), num_pairs)
+            return self._solve_blocks_alone(blocks, stacked, results, use_heuristic_solutions)
+        self._record_model(model, 'optimal', int(fire_offsets[-1]), num_pairs)
+        
+        # Split the assignment back into blocks
+        assigned = [[] for _ in stacked]
+        for h, f in self.assigned_pairs(model):
+            k = h // num_helis
+            assigned[k].append((h - k * num_helis, f - int(fire_offsets[k])))
+        for k, (b, _, cost_hf, time_hf, _, _) in enumerate(stacked):
+            results[b] = (BlockSolution(assigned[k]), cost_hf, time_hf)
+        return results
+    
+    @staticmethod
+    def _stack_heuristics(heuristics: List[HeuristicSolution], num_helis: int, 
+                          fire_offsets: np.ndarray) -> HeuristicSolution:
+        """Heuristic solutions of the blocks, as one solution of the batch model."""
+        assigned = [(h + k * num_helis, f + int(fire_offsets[k]))
+                    for k, heuristic in enumerate(heuristics) for h, f in heuristic.assigned]
+        return HeuristicSolution(
+            assigned, np.concatenate([heuristic.fire_on for heuristic in heuristics]),
+            sum(heuristic.objective for heuristic in heuristics),
+            sum(heuristic.lower_bound for heuristic in heuristics)
+        )
+    
+    def _solve_blocks_alone(self, blocks, stacked, results, use_heuristic_solutions: bool):
+        """Fallback of solve_batch: the blocks' heuristic solutions if asked, else one build_model per block."""
+        for b, _, cost_hf, time_hf, _, heuristic in stacked:
+            if use_heuristic_solutions and heuristic is not None:
+                results[b] = (heuristic, cost_hf, time_hf)
+            else:
+                fire_indices, difficulties, d1, d2, d3, factors = blocks[b]
+                results[b] = self.build_model(fire_indices, difficulties, d1, d2, d3, factors=factors)
+        return results
+    
+    def _report_timing(self):
+        """Print the last scenario's timing split if enabled in config."""
+        if config.get_solver_config().get('report_timing', False):
+            print("[Pyomo] " + " | ".join(f"{k} {v:.3f}s" for k, v in self.last_timing.items()))
+    
+    def _record_model(self, model, status: str, num_fires: int, num_pairs: int):
+        """Add the model's size, solve status and phase timings to the instrumentation record."""
+        if not instrumentation.enabled:
+            return
+        size = {}
+        if isinstance(model, ConcreteModel):
+            size = {'variables': model.nvariables(), 'constraints': model.nconstraints()}
+        instrumentation.add_model(status=status, fires=num_fires, pairs=num_pairs,
+                                  **size, **self.last_timing)
+    
+    def _set_warm_start(self, model: ConcreteModel, heuristic: HeuristicSolution):
+        """Load a heuristic solution into the model's variable values."""
+        assigned = set(heuristic.assigned)
+        num_fires = len(heuristic.fire_on)
+        for f in model.F:
+            # Unused template slots are always on
+            model.FireOn[f].value = 1 if f >= num_fires or heuristic.fire_on[f] else 0
+        for (h, f), assign in model.Assign.items():
+            value = 1 if (h, f) in assigned else 0
+            assign.value = value
+            model.AssignFire[h, f].value = value
+    
+    def _construct_model(self, difficulties, cost_hf_list, time_hf_list, feasible) -> ConcreteModel:
+        """Construct a fresh model over the feasible (helicopter, fire) pairs only."""
+        heli_idx, fire_idx = np.nonzero(feasible)
+        return self._construct_sparse_model(
+            difficulties, heli_idx, fire_idx,
+            np.asarray(cost_hf_list)[heli_idx, fire_idx], np.asarray(time_hf_list)[heli_idx, fire_idx]
+        )
+    
+    def _construct_sparse_model(self, difficulties, heli_idx, fire_idx, costs, times, 
+                                heli_rows: Optional[np.ndarray] = None) -> ConcreteModel:
+        """Construct a model from the list of assignable pairs and their cost / time.
+        
+        Model helicopter h is fleet airframe heli_rows[h] (default: h itself),
+        so a batch model can hold several copies of the fleet.
+        """
+        if heli_rows is None:
+            heli_rows = np.arange(len(self.fleet))
+        pairs = [(int(h), int(f)) for h, f in zip(heli_idx, fire_idx)]
+        helis_by_fire = {f: [] for f in range(len(difficulties))}
+        fires_by_heli = {h: [] for h in range(len(heli_rows))}
+        for h, f in pairs:
+            helis_by_fire[f].append(h)
+            fires_by_heli[h].append(f)
+        supp_capa = self.fleet.supp_capa[heli_rows]
+        time_limit = self.fleet.time_limit[heli_rows]
+        
         # Create model
         model = ConcreteModel()
         
         # Define sets
-        model.H = RangeSet(0, len(self.heli_locs) - 1)  # Helicopters
-        model.F = RangeSet(0, len(fire_indices) - 1)    # Fires
+        model.H = RangeSet(0, len(heli_rows) - 1)  # Helicopters
+        model.F = RangeSet(0, len(difficulties) - 1)    # Fires
+        model.HF = Set(dimen=2, initialize=pairs, ordered=True)  # Feasible pairs
+        model.H_f = Set(model.F, initialize=helis_by_fire)  # Helicopters able to serve fire f
+        model.F_h = Set(model.H, initialize=fires_by_heli)  # Fires reachable by helicopter h
         
         # Define variables
-        model.Assign = Var(model.H, model.F, domain=Binary)  # Helicopter h assigned to fire f
-        model.FireOn = Var(model.F, domain=Binary)           # Fire f is being addressed
-        model.AssignFire = Var(model.H, model.F, domain=Binary)  # Linearization variable
-        
-        time_hf_list, cost_hf_list, arrival_time_hf_list = self.calculate_time_matrices(d1, d2, d3, fire_indices)
+        model.Assign = Var(model.HF, domain=Binary)      # Helicopter h assigned to fire f
+        model.FireOn = Var(model.F, domain=Binary)       # Fire f is being addressed
+        model.AssignFire = Var(model.HF, domain=Binary)  # Linearization variable
 
         # Define parameters
         model.time_hf = Param(
-            model.H, model.F, 
-            initialize={(h, f): time_hf_list[h][f] for h in model.H for f in model.F}
+            model.HF, 
+            initialize={pair: float(t) for pair, t in zip(pairs, times)}
         )
         model.cost_hf = Param(
-            model.H, model.F, 
-            initialize={(h, f): cost_hf_list[h][f] for h in model.H for f in model.F}
-        )
-        model.arrival_time_hf = Param(
-            model.H, model.F, 
-            initialize={(h, f): arrival_time_hf_list[h][f] for h in model.H for f in model.F}
+            model.HF, 
+            initialize={pair: float(c) for pair, c in zip(pairs, costs)}
         )
         model.difficulties = Param(
             model.F, 
@@ -158,11 +492,56 @@ class PyomoOptimizer:
         )
         model.SUPP_CAPA = Param(
             model.H, 
-            initialize={h: self.supp_capa[h] for h in model.H}
+            initialize={h: float(supp_capa[h]) for h in model.H}
         )
+        model.big_penalty = Param(initialize=self.opt_params['big_penalty'])
         model.TIME_LIMIT = Param(
             model.H, 
-            initialize={h: self.time_limit[h] for h in model.H}
+            initialize={h: float(time_limit[h]) for h in model.H}
+        )
+        
+        # Linear constraints
+        model.AssignFire_ub1 = Constraint(model.HF, rule=self.assignfire_upper_bound1)
+        model.AssignFire_ub2 = Constraint(model.HF, rule=self.assignfire_upper_bound2)
+        model.AssignFire_lb = Constraint(model.HF, rule=self.assignfire_lower_bound)
+        
+        # Apply objective function and constraints
+        model.objective = Objective(rule=self.objective_rule, sense=minimize)
+        model.suppression_constraint = Constraint(model.F, rule=self.suppression_rule)
+        model.one_assignment_constraint = Constraint(model.H, rule=self.one_assignment_rule)
+        return model
+    
+    def _build_template(self, capacity: int) -> ConcreteModel:
+        """Construct a reusable model over all helicopters and `capacity` fire slots.
+        
+        Scenario data enters through mutable Params and variable bounds (see
+        _update_template), so the expressions are built once per process.
+        """
+        model = ConcreteModel()
+        
+        # Define sets
+        model.H = RangeSet(0, len(self.fleet) - 1)  # Helicopters
+        model.F = RangeSet(0, capacity - 1)             # Fire slots
+        model.HF = Set(dimen=2, ordered=True)           # Feasible pairs of the current scenario
+        model.H_f = Set(model.F, initialize={f: list(model.H) for f in model.F})
+        model.F_h = Set(model.H, initialize={h: list(model.F) for h in model.H})
+        
+        # Define variables
+        model.Assign = Var(model.H, model.F, domain=Binary)
+        model.FireOn = Var(model.F, domain=Binary)
+        model.AssignFire = Var(model.H, model.F, domain=Binary)
+        
+        # Define parameters (scenario-dependent ones are mutable)
+        model.cost_hf = Param(model.H, model.F, mutable=True, initialize=0.0)
+        model.difficulties = Param(model.F, mutable=True, initialize=0)
+        model.big_penalty = Param(mutable=True, initialize=self.opt_params['big_penalty'])
+        model.SUPP_CAPA = Param(
+            model.H, 
+            initialize={h: float(self.fleet.supp_capa[h]) for h in model.H}
+        )
+        model.TIME_LIMIT = Param(
+            model.H, 
+            initialize={h: float(self.fleet.time_limit[h]) for h in model.H}
         )
         
         # Linear constraints
@@ -172,64 +551,203 @@ class PyomoOptimizer:
         
         # Apply objective function and constraints
         model.objective = Objective(rule=self.objective_rule, sense=minimize)
-        model.golden_time_constraint = Constraint(model.H, model.F, rule=self.golden_time_rule)
-        model.time_limit_constraint = Constraint(model.H, model.F, rule=self.time_limit_rule)
         model.suppression_constraint = Constraint(model.F, rule=self.suppression_rule)
-        model.one_assignment_constraint = Constraint(model.H, rule=self.one_assignment_rule)        
+        model.one_assignment_constraint = Constraint(model.H, rule=self.one_assignment_rule)
+        return model
+    
+    def _update_template(self, difficulties, cost_hf_list, feasible) -> ConcreteModel:
+        """Load a scenario into the reusable template model in place.
         
-        # Solve model
-        try:
+        Unused fire slots are switched off (no demand, no penalty) and
+        infeasible pairs are bounded to zero. The template grows when a
+        scenario has more fires than it has slots.
+        """
+        num_fires = len(difficulties)
+        if self._template is None or num_fires > len(self._template.F):
+            capacity = num_fires if self._template is None else max(num_fires, 2 * len(self._template.F))
+            self._template = self._build_template(capacity)
+        model = self._template
+        capacity = len(model.F)
+        
+        active = np.zeros((len(self.fleet), capacity), dtype=bool)
+        active[:, :num_fires] = feasible
+        cost = np.zeros((len(self.fleet), capacity))
+        cost[:, :num_fires] = cost_hf_list
+        
+        # Bounds rather than fix(): persistent solvers push bound changes
+        # directly instead of re-adding every constraint on the variable
+        model.big_penalty = self.opt_params['big_penalty']
+        for f in model.F:
+            if f < num_fires:
+                model.difficulties[f] = difficulties[f]
+                model.FireOn[f].setlb(0)
+            else:
+                model.difficulties[f] = 0
+                model.FireOn[f].setlb(1)
+        
+        for (h, f), assign in model.Assign.items():
+            model.cost_hf[h, f] = float(cost[h, f])
+            ub = 1 if active[h, f] else 0
+            assign.setub(ub)
+            model.AssignFire[h, f].setub(ub)
+        
+        model.HF.clear()
+        for h, f in zip(*np.nonzero(active)):
+            model.HF.add((int(h), int(f)))
+        return model
+    
+    def _get_solver(self):
+        """Create the configured solver once and reuse it across scenarios."""
+        if self._solver is None:
             solver_config = config.get_solver_config()
-            solver = SolverFactory(solver_config['name'], executable=solver_config['executable_path'])
-            result = solver.solve(model)
-            
-            if result.solver.termination_condition != TerminationCondition.optimal:
-                print("[Pyomo] Could not find optimal solution.")
-                return None, None, None
-                
-            return model, cost_hf_list, time_hf_list
-            
-        except Exception as e:
-            print(f"Error solving model: {e}")
-            return None, None, None
+            if solver_config['name'] in IN_PROCESS_SOLVERS:
+                # In-process HiGHS through Pyomo's APPSI interface (no LP file / subprocess)
+                from pyomo.contrib.appsi.solvers import Highs
+                self._solver = Highs()
+                self._solver.config.load_solution = False
+                if solver_config.get('reuse_model', False):
+                    # The template's structure never changes; only params and bounds do
+                    update = self._solver.update_config
+                    update.check_for_new_or_removed_constraints = False
+                    update.check_for_new_or_removed_vars = False
+                    update.check_for_new_or_removed_params = False
+                    update.check_for_new_objective = False
+                    update.update_constraints = False
+                    update.update_named_expressions = False
+            else:
+                self._solver = SolverFactory(solver_config['name'], 
+                                             executable=solver_config['executable_path'])
+        return self._solver
     
-    def parse_solution(self, model: ConcreteModel, 
+    def solve_model(self, model: ConcreteModel, time_limit: Optional[float] = None, 
+                    warm_start: bool = False) -> bool:
+        """Solve a built model in place; True if an optimal solution was loaded.
+        
+        time_limit (seconds) caps the solver; warm_start passes the current
+        variable values to solvers that accept one.
+        Records the write/solve/load time split in self.last_timing.
+        """
+        solver = self._get_solver()
+        if config.get_solver_config()['name'] in IN_PROCESS_SOLVERS:
+            solver.config.time_limit = time_limit
+            # Pyomo's ConfigDict rejects undeclared keys, and APPSI's HiGHS
+            # config may not declare one; the warm start is skipped then
+            if 'warmstart' in solver.config:
+                solver.config.warmstart = warm_start
+            return self._solve_in_process(solver, model)
+        
+        # Time limit option names of the file-based solvers
+        limit_option = {'glpk': 'tmlim', 'cbc': 'sec'}.get(config.get_solver_config()['name'])
+        if limit_option:
+            solver.options.pop(limit_option, None)
+            if time_limit is not None:
+                solver.options[limit_option] = max(1, math.ceil(time_limit))
+        solve_kwargs = {}
+        if warm_start and solver.warm_start_capable():
+            solve_kwargs['warmstart'] = True
+        return self._solve_shell(solver, model, **solve_kwargs)
+    
+    def _solve_in_process(self, solver, model: ConcreteModel) -> bool:
+        """Solve with a persistent APPSI solver.
+        
+        A new model is transferred with set_instance; a reused template
+        only has its changed params and variable bounds pushed.
+        """
+        from pyomo.common.timing import HierarchicalTimer
+        from pyomo.contrib.appsi.base import TerminationCondition as AppsiTermination
+        
+        timer = HierarchicalTimer()
+        t0 = time.perf_counter()
+        result = solver.solve(model, timer=timer)
+        t1 = time.perf_counter()
+        optimal = result.termination_condition == AppsiTermination.optimal
+        if optimal:
+            result.solution_loader.load_vars()
+        t2 = time.perf_counter()
+        
+        write = sum(timer.timers[key].total_time for key in ('set_instance', 'update')
+                    if key in timer.timers)
+        self.last_timing = {'write': write, 'solve': t1 - t0 - write, 'load': t2 - t1}
+        return optimal
+    
+    def _solve_shell(self, solver, model: ConcreteModel, **solve_kwargs) -> bool:
+        """Solve with a file-based solver (GLPK/CBC executable)."""
+        timing = {'write': 0.0, 'solve': 0.0, 'load': 0.0}
+        
+        # Time the LP write, solver process and result parsing phases that
+        # Pyomo's shell solvers run inside solve(). These are Pyomo internals,
+        # so without all of them the whole call is reported as 'solve'.
+        phases = {'_presolve': 'write', '_apply_solver': 'solve', '_postsolve': 'load'}
+        if not all(callable(getattr(solver, method, None)) for method in phases):
+            phases = {}
+        for method, phase in phases.items():
+            setattr(solver, method, _timed(getattr(solver, method), timing, phase))
+        t0 = time.perf_counter()
+        try:
+            result = solver.solve(model, load_solutions=False, **solve_kwargs)
+        finally:
+            for method in phases:
+                delattr(solver, method)
+        if not phases:
+            timing['solve'] = time.perf_counter() - t0
+        
+        optimal = result.solver.termination_condition == TerminationCondition.optimal
+        if optimal:
+            t0 = time.perf_counter()
+            model.solutions.load_from(result)
+            timing['load'] += time.perf_counter() - t0
+        
+        self.last_timing = timing
+        return optimal
+    
+    def assigned_pairs(self, model: Union[ConcreteModel, HeuristicSolution, BlockSolution]) -> List[Tuple[int, int]]:
+        """(helicopter, fire) pairs assigned in a solved model or heuristic solution."""
+        if isinstance(model, (HeuristicSolution, BlockSolution)):
+            return model.assigned
+        return [
+            (h, f) for h, f in model.HF
+            if model.Assign[h, f].value is not None and model.Assign[h, f].value > 0.5
+        ]
+    
+    @instrumentation.timed('parse_solution')
+    def parse_solution(self, model: Union[ConcreteModel, HeuristicSolution, BlockSolution], 
                       cost_hf: List[List[float]], 
                       time_hf: List[List[float]], 
                       d1: List[List[float]], 
                       d2: List[List[float]], 
                       d3: List[List[float]], 
-                      offset_index: int = 0) -> pd.DataFrame:
-        """Parse Pyomo solution into DataFrame."""
+                      offset_index: int = 0,
+                      fire_indices: Optional[List[int]] = None) -> pd.DataFrame:
+        """Parse Pyomo (or heuristic) solution into DataFrame.
+        
+        Model fire f is reported as fire_indices[f] if given, else offset_index + f.
+        """
         if model is None:
             return pd.DataFrame()
             
         results = []
         
         # Process assignments
-        for h in model.H:
-            for f in model.F:
-                if model.Assign[h, f].value is not None and model.Assign[h, f].value > 0.5:
-                    dist1, dist2, dist3 = d1[h][f], d2[h][f], d3[h][f]
-                    t = time_hf[h][f]
-                    c = cost_hf[h][f]
-                    
-                    # Get helicopter info
-                    model_name = self.heli_df.loc[h, 'model_nm']
-                    base_idx = self.heli_df.loc[h, 'base']
-                    base_name = self.helipads[base_idx][2] if 0 <= base_idx < len(self.helipads) else "UnknownBase"
-                    
-                    results.append({
-                        "Fire Index": offset_index + f,
-                        "Hel Index": h + 1,
-                        "Heli Model": model_name,
-                        "Heli Base": base_name,
-                        "Dist1 (H2W)": round(dist1, 2),
-                        "Dist2 (W2F)": round(dist2, 2),
-                        "Dist3 (F2H)": round(dist3, 2),
-                        "Travel Time": round(t, 2),
-                        "Fuel Cost": round(c, 2),
-                    })
+        for h, f in self.assigned_pairs(model):
+            dist1, dist2, dist3 = d1[h][f], d2[h][f], d3[h][f]
+            t = time_hf[h][f]
+            c = cost_hf[h][f]
+            
+            # Get helicopter info
+            model_name = self.fleet.model_name[h]
+            base_name = self.fleet.base_name[h]
+            
+            results.append({
+                "Fire Index": fire_indices[f] if fire_indices is not None else offset_index + f,
+                "Hel Index": h + 1,
+                "Heli Model": model_name,
+                "Heli Base": base_name,
+                "Dist1 (H2W)": round(dist1, 2),
+                "Dist2 (W2F)": round(dist2, 2),
+                "Dist3 (F2H)": round(dist3, 2),
+                "Travel Time": round(t, 2),
+                "Fuel Cost": round(c, 2),
+            })
         
         # Create and sort DataFrame
         df = pd.DataFrame(results)
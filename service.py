@@ -0,0 +1,181 @@
+"""
+Long-running wildfire dispatch service.
+
+Loads the fleet, water sources and distance caches once per worker and
+accepts fire reports as newline-delimited JSON over a local TCP socket:
+
+    {"fires": [{"name": "산불1", "lat": 37.5, "lng": 127.0,
+                "date": "2025-03-20", "time": "14:00", "intensity": 2}]}
+    {"command": "stats"}
+
+Each request line gets one JSON response line with the assignments and
+latency metrics (milliseconds).
+"""
+
+import sys
+import json
+import time
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+import numpy as np
+
+from utils import config, ScenarioGenerator
+from dispatcher import (WildfireDispatcher, init_scenario_worker, warm_up_scenario_worker,
+                        solve_scenario_task)
+from fleet import FireTable
+
+
+class LatencyStats:
+    """Rolling latency record of the most recent requests."""
+
+    def __init__(self, window: int = 1000):
+        """Keep the last `window` request latencies."""
+        self.requests = 0
+        self.fires = 0
+        self.total_ms = deque(maxlen=window)
+
+    def record(self, num_fires: int, total_ms: float):
+        """Add one served request."""
+        self.requests += 1
+        self.fires += num_fires
+        self.total_ms.append(total_ms)
+
+    def summary(self) -> Dict[str, Any]:
+        """Request counts and latency percentiles over the window."""
+        summary = {'requests': self.requests, 'fires': self.fires}
+        if self.total_ms:
+            p50, p95, p99 = np.percentile(list(self.total_ms), [50, 95, 99])
+            summary.update(p50_ms=round(p50, 2), p95_ms=round(p95, 2), p99_ms=round(p99, 2),
+                           max_ms=round(max(self.total_ms), 2))
+        return summary
+
+
+class DispatchService:
+    """Asyncio dispatch server solving scenario groups in a warm worker pool."""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 workers: Optional[int] = None):
+        """Read service settings from config unless given."""
+        service_params = config.get_service_params()
+        self.host = host or service_params.get('host', '127.0.0.1')
+        self.port = port if port is not None else service_params.get('port', 8765)
+        self.workers = workers if workers is not None else service_params.get('workers', 1)
+        self.stats = LatencyStats()
+        self._executor: Optional[Executor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        """Start and warm the worker pool, then listen for connections."""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        # Each worker solves a dummy group in its initializer; one task per worker starts them all
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 initializer=init_scenario_worker, initargs=(True,))
+        else:
+            # Solvers are not thread-safe: a single thread keeps one warm optimizer
+            self._executor = ThreadPoolExecutor(max_workers=1, initializer=init_scenario_worker,
+                                                initargs=(True,))
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, warm_up_scenario_worker) for _ in range(max(1, self.workers))
+        ))
+        print(f"[Service] {max(1, self.workers)} worker(s) ready in {time.perf_counter() - start:.2f}s")
+
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        print(f"[Service] Listening on {self.host}:{self.port}")
+
+    async def serve_forever(self):
+        """Start the service and serve until cancelled."""
+        await self.start()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop listening and shut down the worker pool."""
+        if self._server is not None:
+            self._server.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def dispatch(self, fire_points: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Solve one report of fires; scenario groups run concurrently in the pool."""
+        received = time.perf_counter()
+        fires = FireTable.coerce(fire_points)
+        groups = ScenarioGenerator.group_by_time_proximity(fires)
+
+        loop = asyncio.get_running_loop()
+        solve_start = time.perf_counter()
+        solutions = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, solve_scenario_task, (group, fires.take(group)))
+            for group in groups
+        ))
+        solve_ms = (time.perf_counter() - solve_start) * 1000
+
+        result_df = WildfireDispatcher.finalize_results(list(solutions))
+        assignments = json.loads(result_df.to_json(orient='records', force_ascii=False)) \
+            if not result_df.empty else []
+        total_ms = (time.perf_counter() - received) * 1000
+        self.stats.record(len(fires), total_ms)
+        return {
+            'assignments': assignments,
+            'latency_ms': {
+                'prepare': round((solve_start - received) * 1000, 2),
+                'solve': round(solve_ms, 2),
+                'total': round(total_ms, 2),
+            },
+            'groups': len(groups),
+        }
+
+    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one decoded request."""
+        command = request.get('command', 'dispatch')
+        if command == 'stats':
+            return self.stats.summary()
+        if command == 'ping':
+            return {'ok': True}
+        if command != 'dispatch':
+            return {'error': f"Unknown command: {command}"}
+
+        fire_points = request['fires'] if 'fires' in request else [request]
+        if not fire_points:
+            return {'assignments': [], 'latency_ms': {}, 'groups': 0}
+        return await self.dispatch(fire_points)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve newline-delimited JSON requests on one connection."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    response = await self.handle_request(json.loads(line))
+                except Exception as e:
+                    print(f"[Service] Error handling request: {e}")
+                    response = {'error': str(e)}
+                writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def main():
+    """Run the dispatch service until interrupted."""
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    try:
+        asyncio.run(DispatchService(port=port).serve_forever())
+    except KeyboardInterrupt:
+        print("\n[Service] Stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Content-addressed cache of solved scenario groups.
+"""
+
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
+import numpy as np
+import pandas as pd
+
+from utils import config, Coords
+from fleet import FireTable
+from travel_time import get_travel_times
+
+if TYPE_CHECKING:
+    from pyomo_optimizer import PyomoOptimizer
+
+# optimization params that change a group's solution (the time window only changes the grouping)
+KEY_OPTIMIZATION_PARAMS = ('fuel_rate', 'big_penalty', 'golden_time_minutes',
+                           'max_helicopter_range_km', 'decompose_groups')
+
+
+class SolutionCache:
+    """LRU of solved scenario groups with an optional on-disk store.
+
+    Keys are fingerprints of everything a group's solution depends on (see
+    fingerprint()); values are solution frames with fire indices stored
+    relative to the group, so a recurring fire set hits the cache wherever
+    it appears in the input. Disabled unless solution_cache.enabled is set.
+    """
+
+    def __init__(self, params: Optional[Dict[str, Any]] = None):
+        """Read settings from config unless given."""
+        params = config.get_solution_cache_params() if params is None else params
+        self.enabled = params.get('enabled', False)
+        self.max_entries = params.get('max_entries', 1024)
+        self.directory = params.get('directory')
+        self._entries: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(optimizer: "PyomoOptimizer", group_fires: FireTable, water_pts: Coords,
+                    available: Optional[np.ndarray] = None,
+                    distances: Optional[Tuple[np.ndarray, ...]] = None) -> str:
+        """Hash of fire coordinates / intensities, the active fleet, solution-relevant
+        settings and the water sources used.
+        
+        water_pts and distances are as passed to solve_scenario_group; precomputed
+        distances are hashed instead of the water points they were derived from.
+        """
+        digest = hashlib.sha256()
+        for column in (group_fires.lat, group_fires.lng, group_fires.intensity):
+            digest.update(np.ascontiguousarray(column).tobytes())
+        if distances is None:
+            digest.update(b"water:" + np.ascontiguousarray(water_pts, dtype=float).tobytes())
+        else:
+            for values in distances:
+                digest.update(b"distances:" + (b"none" if values is None
+                                               else np.ascontiguousarray(values, dtype=float).tobytes()))
+        fleet = optimizer.fleet
+        for col in fleet.__slots__:
+            values = getattr(fleet, col)
+            if values.dtype == object:
+                digest.update("\x1f".join(map(str, values)).encode())
+            else:
+                digest.update(np.ascontiguousarray(values).tobytes())
+        digest.update(b"available:" + (b"all" if available is None
+                                       else np.asarray(available, dtype=bool).tobytes()))
+        settings = {
+            'optimization': {k: optimizer.opt_params.get(k) for k in KEY_OPTIMIZATION_PARAMS},
+            'geo': config.get_geo_params(),
+            'heuristic': config.get_heuristic_params(),
+            'travel_time': get_travel_times().signature,
+        }
+        digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.pkl')
+
+    def get(self, key: str, group: List[int]) -> Optional[pd.DataFrame]:
+        """Cached solution for a group (fire indices mapped onto group), or None."""
+        solution_df = self._entries.get(key)
+        if solution_df is not None:
+            self._entries.move_to_end(key)
+        elif self.directory and os.path.exists(self._path(key)):
+            try:
+                solution_df = pd.read_pickle(self._path(key))
+            except Exception as e:
+                print(f"Warning: Could not read cached solution {key}: {e}")
+                solution_df = None
+            if solution_df is not None:
+                self._remember(key, solution_df)
+        if solution_df is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        solution_df = solution_df.copy()
+        solution_df["Fire Index"] = np.asarray(group)[solution_df["Fire Index"].to_numpy(dtype=int)]
+        return solution_df
+
+    def put(self, key: str, group: List[int], solution_df: pd.DataFrame):
+        """Store a group's solution, with fire indices made relative to the group."""
+        position = {fire: pos for pos, fire in enumerate(group)}
+        solution_df = solution_df.copy()
+        solution_df["Fire Index"] = solution_df["Fire Index"].map(position)
+        self._remember(key, solution_df)
+        if self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                # Write then rename, so concurrent workers never read a partial file
+                tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+                solution_df.to_pickle(tmp_path)
+                os.replace(tmp_path, self._path(key))
+            except OSError as e:
+                print(f"Warning: Could not write cached solution {key}: {e}")
+
+    def _remember(self, key: str, solution_df: pd.DataFrame):
+        """Insert into the in-memory LRU, evicting the least recently used entry."""
+        self._entries[key] = solution_df
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop the in-memory entries (the on-disk store is kept)."""
+        self._entries.clear()
+
+
+# Global solution cache instance
+solution_cache = SolutionCache()
@@ -0,0 +1,117 @@
+"""
+Spatial index over water sources for fast k-nearest and radius lookups.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import List, Tuple
+import numpy as np
+from scipy.spatial import cKDTree
+
+from utils import GeoUtils, Coords
+
+
+class WaterSourceIndex:
+    """KD-tree over water sources on 3D unit-sphere coordinates."""
+
+    # Most recently used indexes of this process, keyed by a fingerprint of the points
+    _instances: "OrderedDict[str, WaterSourceIndex]" = OrderedDict()
+    MAX_INSTANCES = 4
+
+    # Upper bound on the relative gap between sphere and WGS-84 distances,
+    # used to make sure re-ranking by exact distance never misses a point
+    SPHERE_TOLERANCE = 0.01
+
+    def __init__(self, water_pts: Coords):
+        """Build the index from (lat, lng) water points."""
+        self.points = np.asarray(water_pts, dtype=float).reshape(-1, 2)
+        self.tree = cKDTree(self._to_unit_sphere(self.points))
+
+    @classmethod
+    def get(cls, water_pts: Coords) -> "WaterSourceIndex":
+        """Return the process-wide index for these water points, building it once.
+
+        Only the MAX_INSTANCES most recently used water sets keep their tree.
+        """
+        points = np.ascontiguousarray(water_pts, dtype=float).reshape(-1, 2)
+        key = hashlib.sha1(points.tobytes()).hexdigest()
+        index = cls._instances.get(key)
+        if index is None:
+            index = cls._instances[key] = cls(points)
+            while len(cls._instances) > cls.MAX_INSTANCES:
+                cls._instances.popitem(last=False)
+        cls._instances.move_to_end(key)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    @staticmethod
+    def _to_unit_sphere(coords: Coords) -> np.ndarray:
+        """Convert (lat, lng) degrees to unit vectors."""
+        rad = np.radians(np.asarray(coords, dtype=float).reshape(-1, 2))
+        cos_lat = np.cos(rad[:, 0])
+        return np.column_stack([
+            cos_lat * np.cos(rad[:, 1]),
+            cos_lat * np.sin(rad[:, 1]),
+            np.sin(rad[:, 0]),
+        ])
+
+    @staticmethod
+    def _km_to_chord(radius_km: float) -> float:
+        """Convert a great-circle distance to a unit-sphere chord length."""
+        angle = min(radius_km / GeoUtils.EARTH_RADIUS_KM, np.pi)
+        return 2 * np.sin(angle / 2)
+
+    @staticmethod
+    def _chord_to_km(chord: np.ndarray) -> np.ndarray:
+        """Convert unit-sphere chord lengths to great-circle distances."""
+        return 2 * GeoUtils.EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0.0, 1.0))
+
+    def query_radius(self, coords: Coords, radius_km: float,
+                     mode: str = None) -> List[np.ndarray]:
+        """Indices of water points within radius_km of each query point."""
+        coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+        chord = self._km_to_chord(radius_km * (1 + self.SPHERE_TOLERANCE))
+        candidates = self.tree.query_ball_point(self._to_unit_sphere(coords), chord)
+
+        results = []
+        for loc, cand in zip(coords, candidates):
+            cand = np.sort(np.asarray(cand, dtype=int))
+            dist = GeoUtils.paired_distance(loc, self.points[cand], mode)
+            results.append(cand[dist <= radius_km])
+        return results
+
+    def query_knn(self, coords: Coords, k: int,
+                  mode: str = None) -> Tuple[np.ndarray, np.ndarray]:
+        """k nearest water points per query point.
+
+        Returns (indices, distances_km), each of shape (n, k), ordered by
+        distance in the requested mode with ties broken by water index.
+        """
+        coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+        k = min(k, len(self.points))
+        if len(coords) == 0 or k == 0:
+            return np.zeros((len(coords), 0), dtype=int), np.zeros((len(coords), 0))
+
+        # Over-fetch on the sphere, then re-rank by exact distance
+        k_query = min(len(self.points), max(2 * k, k + 8))
+        chord, cand = self.tree.query(self._to_unit_sphere(coords), k=k_query)
+        chord = chord.reshape(len(coords), -1)
+        cand = cand.reshape(len(coords), -1)
+
+        exact = GeoUtils.paired_distance(coords[:, None, :], self.points[cand], mode)
+        order = np.lexsort((cand, exact), axis=1)[:, :k]
+        idx = np.take_along_axis(cand, order, axis=1)
+        dist = np.take_along_axis(exact, order, axis=1)
+
+        # A closer point may lie beyond the fetched candidates; widen those rows
+        if k_query < len(self.points):
+            fetched_km = self._chord_to_km(chord[:, -1])
+            for i in np.nonzero(fetched_km <= dist[:, -1] * (1 + self.SPHERE_TOLERANCE))[0]:
+                wide = self.query_radius(coords[i], dist[i, -1], mode)[0]
+                wide = np.union1d(wide, cand[i])
+                exact_i = GeoUtils.paired_distance(coords[i], self.points[wide], mode)
+                order_i = np.lexsort((wide, exact_i))[:k]
+                idx[i], dist[i] = wide[order_i], exact_i[order_i]
+        return idx, dist
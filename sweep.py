@@ -0,0 +1,236 @@
+"""
+Parameter sweep over the optimization and simulation settings.
+
+Unlike experiment_runner.sh, which rewrites config.json and runs main.py once
+per configuration, the sweep loads the fires and selects water sources for
+every (helicopter, fire) pair once; these inputs do not depend on the swept
+parameters. Each grid point is then solved in a process pool, with its
+parameters applied only to the worker's in-memory configuration. Results are
+collected in one tidy table with one row per grid point and dispatcher.
+config.json is never modified.
+
+Usage:
+    python sweep.py --fuel-rate 0.1 0.15 0.2 --golden-time 10 15 20 --workers 4
+    python sweep.py --time-window 15 30 60 --seeds 40 41 42 --output sweep.csv
+"""
+
+import os
+import time
+import argparse
+import itertools
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Sequence, Tuple, Optional
+import numpy as np
+import pandas as pd
+
+from utils import config, ScenarioGenerator
+from data_loader import DataLoader
+from fleet import FireTable
+
+# Swept parameter -> config.json section
+PARAMETERS = {
+    'fuel_rate': 'optimization',
+    'big_penalty': 'optimization',
+    'golden_time_minutes': 'optimization',
+    'scenario_time_window_minutes': 'optimization',
+    'max_helicopter_range_km': 'optimization',
+    'random_seed': 'simulation',
+}
+
+# Parameters each dispatcher depends on; other axes would only repeat identical runs
+OPTIMIZED_PARAMETERS = ('fuel_rate', 'big_penalty', 'golden_time_minutes',
+                        'scenario_time_window_minutes', 'max_helicopter_range_km')
+BASIC_PARAMETERS = ('max_helicopter_range_km', 'random_seed')
+
+RESULTS_DIR = "sweep_results"
+
+
+class SweepData:
+    """Inputs shared by every grid point: the fires and their (airframe x fire) distances."""
+
+    def __init__(self, fires: FireTable, d1: np.ndarray, d2: np.ndarray, d3: np.ndarray,
+                 factors: Optional[np.ndarray] = None):
+        """Store fires, the d1/d2/d3 matrices over all fires and their leg factors."""
+        self.fires = fires
+        self.d1, self.d2, self.d3 = d1, d2, d3
+        self.factors = factors
+
+    def distances(self, group: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """d1/d2/d3 and leg factors of a group of fires, as returned by compute_distances."""
+        factors = None if self.factors is None else self.factors[:, :, group]
+        return self.d1[:, group], self.d2[:, group], self.d3[:, group], factors
+
+    @classmethod
+    def prepare(cls) -> Optional["SweepData"]:
+        """Load the fires and select water sources for all of them once."""
+        from pyomo_optimizer import PyomoOptimizer
+
+        fires = DataLoader.load_fires()
+        if not fires:
+            print("Error: No fire data loaded")
+            return None
+        optimizer = PyomoOptimizer()
+        return cls(fires, *optimizer.compute_distances(fires.coords, DataLoader.load_water_sources()))
+
+
+def expand_grid(grid: Dict[str, Sequence[Any]], names: Sequence[str]) -> List[Dict[str, Any]]:
+    """All combinations of the grid values of the given parameters."""
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+@contextmanager
+def override_config(params: Dict[str, Any]):
+    """Apply swept parameters to the in-memory configuration, restoring them on exit."""
+    previous = {name: config.config[PARAMETERS[name]][name] for name in params}
+    for name, value in params.items():
+        config.config[PARAMETERS[name]][name] = value
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            config.config[PARAMETERS[name]][name] = value
+
+
+# Per-process state of sweep workers
+_sweep_data: Optional[SweepData] = None
+_sweep_optimizer = None
+
+
+def init_sweep_worker(data: SweepData, solver: Optional[str] = None):
+    """Keep the shared inputs and one optimizer per worker process."""
+    global _sweep_data, _sweep_optimizer
+    from pyomo_optimizer import PyomoOptimizer
+    if solver:
+        config.config['solver']['name'] = solver
+    _sweep_data = data
+    _sweep_optimizer = PyomoOptimizer()
+
+
+def _optimized_metrics(data: SweepData) -> Dict[str, Any]:
+    """Solve all scenario groups with the current configuration and summarize."""
+    from dispatcher import WildfireDispatcher, solve_scenario_group
+
+    fires = data.fires
+    time_window = config.get_optimization_params()['scenario_time_window_minutes']
+    groups = ScenarioGenerator.time_window_groups(fires.timestamp, time_window)
+    solutions = [
+        solve_scenario_group(_sweep_optimizer, None, fires.take(group), group.tolist(),
+                             distances=data.distances(group))
+        for group in groups
+    ]
+    result_df = WildfireDispatcher.finalize_results(solutions)
+
+    if "Hel Index" not in result_df:
+        return {'groups': len(groups), 'assigned_fires': 0, 'unassigned_fires': len(fires),
+                'airframes': 0, 'fuel_cost': 0.0, 'mean_travel_time': None}
+    assigned = result_df[result_df["Hel Index"].notna()]
+    assigned_fires = assigned["Fire Index"].nunique()
+    return {
+        'groups': len(groups),
+        'assigned_fires': assigned_fires,
+        'unassigned_fires': len(fires) - assigned_fires,
+        'airframes': len(assigned),
+        'fuel_cost': round(float(assigned["Fuel Cost"].sum()), 2),
+        'mean_travel_time': round(float(assigned["Travel Time"].mean()), 2) if len(assigned) else None,
+    }
+
+
+def _basic_metrics(data: SweepData) -> Dict[str, Any]:
+    """Run the proximity dispatcher with the current configuration and summarize."""
+    from dispatcher import BasicDispatcher
+
+    dispatch_df = BasicDispatcher().dispatch(data.fires)
+    if dispatch_df.empty:
+        return {'assigned_fires': 0, 'unassigned_fires': len(data.fires), 'airframes': 0}
+    sent = dispatch_df[dispatch_df['Heli Count'] != 0]
+    assigned_fires = sent['Fire Index'].nunique()
+    return {
+        'assigned_fires': assigned_fires,
+        'unassigned_fires': len(data.fires) - assigned_fires,
+        'airframes': int(sent['Heli Count'].astype(str).str.split('/').str[0].astype(int).sum()),
+    }
+
+
+def run_point(task: Tuple[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Run one dispatcher ('basic' or 'optimized') at one grid point."""
+    mode, params = task
+    start = time.perf_counter()
+    with override_config(params):
+        metrics = _basic_metrics(_sweep_data) if mode == 'basic' else _optimized_metrics(_sweep_data)
+    # Parameters the dispatcher does not depend on are left empty
+    return {'mode': mode, **{name: params.get(name) for name in PARAMETERS},
+            'fires': len(_sweep_data.fires), **metrics, 'wall_s': round(time.perf_counter() - start, 3)}
+
+
+def run_sweep(grid: Dict[str, Sequence[Any]], modes: Sequence[str] = ('basic', 'optimized'),
+              workers: int = 1, solver: Optional[str] = None) -> pd.DataFrame:
+    """Run every grid point and return the tidy results table."""
+    data = SweepData.prepare()
+    if data is None:
+        return pd.DataFrame()
+
+    tasks = []
+    if 'optimized' in modes:
+        tasks += [('optimized', params) for params in expand_grid(grid, OPTIMIZED_PARAMETERS)]
+    if 'basic' in modes:
+        tasks += [('basic', params) for params in expand_grid(grid, BASIC_PARAMETERS)]
+    print(f"[Sweep] {len(tasks)} run(s) over {len(data.fires)} fires with {workers} worker(s)")
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=init_sweep_worker,
+                                 initargs=(data, solver)) as pool:
+            rows = list(pool.map(run_point, tasks))
+    else:
+        init_sweep_worker(data, solver)
+        rows = [run_point(task) for task in tasks]
+
+    return pd.DataFrame(rows)
+
+
+def main():
+    """Parse the grid, run the sweep and write the results table (CSV)."""
+    opt_params = config.get_optimization_params()
+    parser = argparse.ArgumentParser(description="Parameter sweep for wildfire helicopter dispatch")
+    parser.add_argument("--fuel-rate", type=float, nargs='+', default=[opt_params['fuel_rate']])
+    parser.add_argument("--big-penalty", type=float, nargs='+', default=[opt_params['big_penalty']])
+    parser.add_argument("--golden-time", type=float, nargs='+',
+                        default=[opt_params['golden_time_minutes']], help="golden_time_minutes values")
+    parser.add_argument("--time-window", type=float, nargs='+',
+                        default=[opt_params['scenario_time_window_minutes']],
+                        help="scenario_time_window_minutes values")
+    parser.add_argument("--max-range", type=float, nargs='+',
+                        default=[opt_params['max_helicopter_range_km']], help="max_helicopter_range_km values")
+    parser.add_argument("--seeds", type=int, nargs='+',
+                        default=[config.get_simulation_params()['random_seed']], help="random_seed values")
+    parser.add_argument("--modes", choices=["basic", "optimized"], nargs='+', default=["basic", "optimized"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--solver", help="solver name for this sweep (config.json is not changed)")
+    parser.add_argument("--output", help=f"results CSV (default: {RESULTS_DIR}/sweep-<time>.csv)")
+    args = parser.parse_args()
+
+    grid = {
+        'fuel_rate': args.fuel_rate,
+        'big_penalty': args.big_penalty,
+        'golden_time_minutes': args.golden_time,
+        'scenario_time_window_minutes': args.time_window,
+        'max_helicopter_range_km': args.max_range,
+        'random_seed': args.seeds,
+    }
+    if args.solver:
+        config.config['solver']['name'] = args.solver
+
+    results = run_sweep(grid, modes=args.modes, workers=args.workers, solver=args.solver)
+    if results.empty:
+        print("No sweep results")
+        return
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("sweep-%Y%m%d-%H%M%S.csv"))
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    results.to_csv(output, index=False)
+    print(results.to_string(index=False))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
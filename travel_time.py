@@ -0,0 +1,256 @@
+"""
+Travel-time providers for helicopter flight legs.
+
+A provider returns, per leg, the factor by which flying it takes longer than
+flying the straight great-circle distance in still air. Water sources are
+chosen by factored distance, and the optimizer multiplies the leg times
+(distance / airframe speed) by the factors; the distances themselves (the
+range limit and the Dist columns) stay in km. The great-circle provider
+(default) returns no factors at all.
+"""
+
+import os
+import json
+import math
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+
+from utils import config
+
+# Ground speed never drops below this fraction of the airspeed (strong headwinds)
+MIN_GROUND_SPEED_RATIO = 0.2
+
+# Legs evaluated per block when sampling a raster, to bound memory
+RASTER_BLOCK_LEGS = 200000
+
+
+def _bearings(origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+    """Initial great-circle bearing (radians, clockwise from north) of each leg."""
+    lat1, lng1 = np.radians(origins[..., 0]), np.radians(origins[..., 1])
+    lat2, lng2 = np.radians(destinations[..., 0]), np.radians(destinations[..., 1])
+    dlng = lng2 - lng1
+    return np.arctan2(np.sin(dlng) * np.cos(lat2),
+                      np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlng))
+
+
+class GreatCircleProvider:
+    """Straight-line flight in still air: travel time is distance / speed."""
+
+    name = 'great_circle'
+
+    def signature(self) -> Dict[str, Any]:
+        """Settings that determine the provider's output (cache key)."""
+        return {'provider': self.name}
+
+    def leg_factors(self, origins: np.ndarray, destinations: np.ndarray) -> Optional[np.ndarray]:
+        """Per-leg time factors for broadcastable (..., 2) endpoint arrays; None means 1 everywhere."""
+        return None
+
+
+class WindProvider:
+    """Constant wind: each leg is flown at the ground speed given by the wind triangle.
+
+    The factor is airspeed / ground speed at reference_speed (km/min), a
+    typical cruise speed of the fleet, along the leg's initial bearing. This
+    is a simplification: factors are per leg, not per airframe, so all
+    models (and the empty and loaded legs) see the same relative wind effect.
+    """
+
+    name = 'wind'
+
+    def __init__(self, speed_kmh: float, from_deg: float, reference_speed: float):
+        """Wind speed (km/h), direction it blows from (degrees) and reference airspeed (km/min)."""
+        self.speed = speed_kmh / 60.0
+        self.from_deg = from_deg
+        self.reference_speed = reference_speed
+
+    def signature(self) -> Dict[str, Any]:
+        """Settings that determine the provider's output (cache key)."""
+        return {'provider': self.name, 'speed_kmh': self.speed * 60.0,
+                'from_deg': self.from_deg, 'reference_speed': self.reference_speed}
+
+    def leg_factors(self, origins: np.ndarray, destinations: np.ndarray) -> Optional[np.ndarray]:
+        """Per-leg time factors for broadcastable (..., 2) endpoint arrays."""
+        if self.speed == 0:
+            return None
+        # Angle between the track and the direction the wind blows towards
+        angle = _bearings(origins, destinations) - math.radians(self.from_deg + 180.0)
+        along, cross = self.speed * np.cos(angle), self.speed * np.sin(angle)
+        airspeed = self.reference_speed
+        ground_speed = np.sqrt(np.maximum(airspeed ** 2 - cross ** 2, 0.0)) + along
+        return airspeed / np.maximum(ground_speed, MIN_GROUND_SPEED_RATIO * airspeed)
+
+
+class TerrainGridProvider:
+    """Obstacle / terrain penalties from a local cost raster.
+
+    The raster is an ESRI ASCII grid (.asc) in WGS-84 degrees whose cells hold
+    time multipliers (1 = open terrain, e.g. 1.3 = detour around ridges or
+    restricted airspace; NODATA and cells outside the grid count as 1). A
+    leg's factor is the mean multiplier at `samples` points along it.
+    """
+
+    name = 'terrain_grid'
+
+    def __init__(self, raster_path: str, samples: int = 16):
+        """Load the raster; samples is the number of points evaluated per leg."""
+        self.raster_path = raster_path
+        self.samples = samples
+        self.grid, self.west, self.north, self.cell_size = self._read_ascii_grid(raster_path)
+
+    @staticmethod
+    def _read_ascii_grid(path: str) -> Tuple[np.ndarray, float, float, float]:
+        """(values, west edge, north edge, cell size) of an ESRI ASCII grid.
+
+        The header is the leading `key value` lines; NODATA_value is optional.
+        """
+        header = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            line = f.readline()
+            while line and line.split() and line.split()[0][0].isalpha():
+                key, value = line.split()[:2]
+                header[key.lower()] = float(value)
+                line = f.readline()
+            values = np.loadtxt([line] + f.readlines(), dtype=float, ndmin=2)
+        missing = [key for key in ('ncols', 'nrows', 'cellsize') if key not in header]
+        missing += [f"{axis}llcorner/{axis}llcenter" for axis in 'xy'
+                    if f"{axis}llcorner" not in header and f"{axis}llcenter" not in header]
+        if missing:
+            raise ValueError(f"Invalid ASCII grid {path}: missing {', '.join(missing)}")
+        if values.shape != (int(header['nrows']), int(header['ncols'])):
+            raise ValueError(f"Invalid ASCII grid {path}: expected {int(header['nrows'])} x "
+                             f"{int(header['ncols'])} values, got {values.shape[0]} x {values.shape[1]}")
+        nodata = header.get('nodata_value')
+        if nodata is not None:
+            values[values == nodata] = 1.0
+        cell_size = header['cellsize']
+        south = header['yllcorner'] if 'yllcorner' in header else header['yllcenter'] - cell_size / 2
+        west = header['xllcorner'] if 'xllcorner' in header else header['xllcenter'] - cell_size / 2
+        return values, west, south + values.shape[0] * cell_size, cell_size
+
+    def signature(self) -> Dict[str, Any]:
+        """Settings that determine the provider's output (cache key)."""
+        st = os.stat(self.raster_path)
+        return {'provider': self.name, 'raster': self.raster_path,
+                'raster_file': [st.st_mtime_ns, st.st_size], 'samples': self.samples}
+
+    def _sample(self, points: np.ndarray) -> np.ndarray:
+        """Raster value at (..., 2) points; 1 outside the grid."""
+        rows = np.floor((self.north - points[..., 0]) / self.cell_size).astype(int)
+        cols = np.floor((points[..., 1] - self.west) / self.cell_size).astype(int)
+        inside = (rows >= 0) & (rows < self.grid.shape[0]) & (cols >= 0) & (cols < self.grid.shape[1])
+        values = np.ones(points.shape[:-1])
+        values[inside] = self.grid[rows[inside], cols[inside]]
+        return values
+
+    def leg_factors(self, origins: np.ndarray, destinations: np.ndarray) -> Optional[np.ndarray]:
+        """Per-leg time factors for broadcastable (..., 2) endpoint arrays."""
+        origins, destinations = np.broadcast_arrays(np.asarray(origins, dtype=float),
+                                                    np.asarray(destinations, dtype=float))
+        shape = origins.shape[:-1]
+        origins, destinations = origins.reshape(-1, 2), destinations.reshape(-1, 2)
+        # Midpoints of `samples` equal segments of the (short, locally straight) leg
+        t = (np.arange(self.samples) + 0.5) / self.samples
+        factors = np.empty(len(origins))
+        for start in range(0, len(origins), RASTER_BLOCK_LEGS):
+            o = origins[start:start + RASTER_BLOCK_LEGS, None, :]
+            d = destinations[start:start + RASTER_BLOCK_LEGS, None, :]
+            factors[start:start + RASTER_BLOCK_LEGS] = self._sample(o + (d - o) * t[:, None]).mean(axis=1)
+        return factors.reshape(shape)
+
+
+class TravelTimes:
+    """The configured provider, with leg factors to fixed destination sets cached per cell.
+
+    Fire -> base and base -> water legs recur across scenarios; their factors
+    are kept as dense (cell x fixed point) rows, evaluated at cell centres
+    (cell_deg grid), so a fire or water source in a known cell costs one lookup.
+    """
+
+    def __init__(self, provider, cell_deg: float = 0.01):
+        """Wrap a provider; cell_deg is the origin cell size (degrees) of the row cache."""
+        self.provider = provider
+        self.cell_deg = cell_deg
+        self._rows: Dict[bytes, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @property
+    def signature(self) -> Dict[str, Any]:
+        """Provider settings (cache key for matrices built with it)."""
+        return self.provider.signature()
+
+    @property
+    def is_identity(self) -> bool:
+        """True if all factors are 1 (great-circle provider)."""
+        return isinstance(self.provider, GreatCircleProvider)
+
+    def leg_factors(self, origins: np.ndarray, destinations: np.ndarray) -> Optional[np.ndarray]:
+        """Per-leg factors for broadcastable (..., 2) endpoint arrays; None means 1 everywhere."""
+        return self.provider.leg_factors(np.asarray(origins, dtype=float),
+                                         np.asarray(destinations, dtype=float))
+
+    def matrix(self, origins: np.ndarray, destinations: np.ndarray) -> Optional[np.ndarray]:
+        """(origin x destination) factors; None means 1 everywhere."""
+        origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+        destinations = np.asarray(destinations, dtype=float).reshape(-1, 2)
+        return self.leg_factors(origins[:, None, :], destinations[None, :, :])
+
+    def cached_matrix(self, origins: np.ndarray, destinations: np.ndarray,
+                      inbound: bool = False) -> Optional[np.ndarray]:
+        """(origin x destination) factors with origins snapped to cells and rows cached.
+
+        With inbound, the legs are flown from each destination to the origin.
+        """
+        if self.is_identity:
+            return None
+        origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+        destinations = np.ascontiguousarray(destinations, dtype=float).reshape(-1, 2)
+        offset = np.array([90.0, 180.0])
+        cells = np.floor((origins + offset) / self.cell_deg).astype(np.int64)
+        cell_ids = cells[:, 0] * (1 << 32) + cells[:, 1]
+
+        key = destinations.tobytes() + (b'inbound' if inbound else b'outbound')
+        known_ids, known_rows = self._rows.get(key, (np.empty(0, dtype=np.int64),
+                                                     np.empty((0, len(destinations)))))
+        new_ids, first = np.unique(cell_ids, return_index=True)
+        unseen = ~np.isin(new_ids, known_ids)
+        new_ids, first = new_ids[unseen], first[unseen]
+        if len(new_ids):
+            centres = (cells[first] + 0.5) * self.cell_deg - offset
+            if inbound:
+                new_rows = self.matrix(destinations, centres)
+                new_rows = None if new_rows is None else new_rows.T
+            else:
+                new_rows = self.matrix(centres, destinations)
+            if new_rows is None:
+                new_rows = np.ones((len(new_ids), len(destinations)))
+            known_ids = np.concatenate([known_ids, new_ids])
+            known_rows = np.concatenate([known_rows, new_rows])
+            order = np.argsort(known_ids)
+            known_ids, known_rows = known_ids[order], known_rows[order]
+            self._rows[key] = (known_ids, known_rows)
+        return known_rows[np.searchsorted(known_ids, cell_ids)]
+
+
+_travel_times: Optional[TravelTimes] = None
+_travel_times_params: Optional[str] = None
+
+
+def get_travel_times() -> TravelTimes:
+    """TravelTimes for config geo.travel_time, rebuilt when the settings change."""
+    global _travel_times, _travel_times_params
+    params = config.get_geo_params().get('travel_time', {})
+    params_key = json.dumps(params, sort_keys=True)
+    if _travel_times is None or params_key != _travel_times_params:
+        name = params.get('provider', 'great_circle')
+        if name == 'great_circle':
+            provider = GreatCircleProvider()
+        elif name == 'wind':
+            provider = WindProvider(params.get('wind_speed_kmh', 0.0), params.get('wind_from_deg', 0.0),
+                                    params.get('reference_speed', 4.0))
+        elif name == 'terrain_grid':
+            provider = TerrainGridProvider(params['raster'], params.get('samples', 16))
+        else:
+            raise ValueError(f"Unknown travel time provider: {name}")
+        _travel_times = TravelTimes(provider, params.get('cell_deg', 0.01))
+        _travel_times_params = params_key
+    return _travel_times
@@ -1,9 +1,17 @@
 import json
 import sys
-import datetime
 import shutil
-from typing import Dict, Any, List, Tuple
-from geopy.distance import geodesic
+import importlib.util
+from typing import Dict, Any, List, Tuple, Sequence, Union, Iterable, Iterator, Optional
+import numpy as np
+
+from fleet import FireTable, Fires
+
+# Solvers driven in-process through Pyomo's APPSI interface (require highspy)
+IN_PROCESS_SOLVERS = ('highs', 'appsi_highs')
+
+# (lat, lng) pairs either as a list of tuples or an (N, 2) array
+Coords = Union[Sequence[Tuple[float, float]], np.ndarray]
 
 class ConfigManager:
     """Manages configuration loaded from JSON file."""
@@ -19,9 +27,10 @@ class ConfigManager:
         self.HELIPADS_PATH = self.config['paths']['helipads']
         self.HELI_SPECS_PATH = self.config['paths']['heli_specs']
         self.SHAPEFILE_WATER = self.config['paths']['water_sources']
+        self.CACHE_DIR = self.config['paths'].get('cache_dir', 'static/cache')
         
-        # Dynamically set solver executable path
-        self._set_solver_path()
+        # Solver executable is located on first use (see get_solver_config)
+        self._solver_resolved = False
     
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from JSON file."""
@@ -40,6 +49,14 @@ class ConfigManager:
         solver_name = self.config['solver'].get('name', 'glpk')  # Default to CBC
         executable_path = self.config['solver'].get('executable_path')
         
+        # In-process solvers need no executable, only the highspy package
+        if solver_name in IN_PROCESS_SOLVERS:
+            if importlib.util.find_spec('highspy') is not None:
+                return
+            print(f"Warning: Solver '{solver_name}' requires highspy, which is not installed. "
+                  f"Falling back to GLPK/CBC.")
+            executable_path = None
+        
         # If executable_path is not provided or invalid, find it dynamically
         if not executable_path or not shutil.which(executable_path):
             # Try to find the solver executable
@@ -74,12 +91,39 @@ class ConfigManager:
         return self.config['optimization']
     
     def get_solver_config(self) -> Dict[str, Any]:
-        """Get solver configuration."""
+        """Get solver configuration, locating the solver executable on first use."""
+        if not self._solver_resolved:
+            self._set_solver_path()
+            self._solver_resolved = True
         return self.config['solver']
     
     def get_simulation_params(self) -> Dict[str, Any]:
         """Get simulation parameters."""
         return self.config['simulation']
+    
+    def get_heuristic_params(self) -> Dict[str, Any]:
+        """Get greedy heuristic fast-path parameters."""
+        return self.config.get('heuristic', {})
+    
+    def get_geo_params(self) -> Dict[str, Any]:
+        """Get geographic computation parameters."""
+        return self.config.get('geo', {})
+    
+    def get_rolling_horizon_params(self) -> Dict[str, Any]:
+        """Get rolling-horizon (fleet state across scenarios) parameters."""
+        return self.config.get('rolling_horizon', {})
+    
+    def get_service_params(self) -> Dict[str, Any]:
+        """Get dispatch service (host, port, workers) parameters."""
+        return self.config.get('service', {})
+
+    def get_instrumentation_params(self) -> Dict[str, Any]:
+        """Get profiling/instrumentation settings (disabled when absent)."""
+        return self.config.get('instrumentation', {})
+
+    def get_solution_cache_params(self) -> Dict[str, Any]:
+        """Get solved-scenario cache settings (disabled when absent)."""
+        return self.config.get('solution_cache', {})
 
 # Global configuration instance
 config = ConfigManager()
@@ -87,101 +131,342 @@ config = ConfigManager()
 class GeoUtils:
     """Geographic utility functions."""
     
+    # Mean earth radius (IUGG) used by the spherical haversine mode
+    EARTH_RADIUS_KM = 6371.0088
+    
+    # WGS-84 ellipsoid used by the geodesic (Vincenty) mode
+    WGS84_A = 6378137.0
+    WGS84_F = 1 / 298.257223563
+    
+    # Vincenty results agree with geopy's Karney geodesic to within this
+    # tolerance (km); pairs where the iteration does not converge (nearly
+    # antipodal points) are delegated to geopy directly.
+    GEODESIC_TOLERANCE_KM = 1e-6
+    
     @staticmethod
     def calculate_distance(loc1: Tuple[float, float], 
                           loc2: Tuple[float, float]) -> float:
         """Calculate distance between two lat-lng points using geodesic."""
+        from geopy.distance import geodesic  # only needed for single pairs / fallback
         return geodesic(loc1, loc2).kilometers
     
     @staticmethod
-    def find_optimal_water_sources(fire_coords: List[Tuple[float, float]], 
-                                  water_pts: List[Tuple[float, float]],
-                                  heli_locs: List[Tuple[float, float]]) -> Tuple[List[List[float]], 
-                                                                               List[List[float]], 
-                                                                               List[List[float]]]:
-        """For each fire and helicopter, find the optimal water source."""
-        if not fire_coords or not heli_locs:
-            return [], [], []
+    def _haversine(lat1, lng1, lat2, lng2) -> np.ndarray:
+        """Broadcasting great-circle distance (km) between radian coordinates."""
+        a = (np.sin((lat2 - lat1) / 2) ** 2 +
+             np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+        return 2 * GeoUtils.EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    
+    @staticmethod
+    def _vincenty(lat1, lng1, lat2, lng2, max_iter: int = 200) -> Tuple[np.ndarray, np.ndarray]:
+        """Broadcasting WGS-84 Vincenty distance (km) between radian coordinates.
+        
+        Returns (distance, converged) arrays of the broadcast shape.
+        """
+        a, f = GeoUtils.WGS84_A, GeoUtils.WGS84_F
+        b = (1 - f) * a
+        
+        L = np.asarray(lng2 - lng1, dtype=float)
+        U1 = np.arctan((1 - f) * np.tan(lat1))
+        U2 = np.arctan((1 - f) * np.tan(lat2))
+        sin_u1, cos_u1 = np.sin(U1), np.cos(U1)
+        sin_u2, cos_u2 = np.sin(U2), np.cos(U2)
+        L = np.broadcast_to(L, np.broadcast(L, U1, U2).shape)
+        
+        lam = L.copy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for _ in range(max_iter):
+                sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+                sin_sigma = np.sqrt((cos_u2 * sin_lam) ** 2 +
+                                    (cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam) ** 2)
+                cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+                sigma = np.arctan2(sin_sigma, cos_sigma)
+                sin_alpha = np.where(sin_sigma == 0, 0.0,
+                                     cos_u1 * cos_u2 * sin_lam / sin_sigma)
+                cos2_alpha = 1 - sin_alpha ** 2
+                # Equatorial lines have cos2_alpha == 0
+                cos_2sm = np.where(cos2_alpha == 0, 0.0,
+                                   cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha)
+                C = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+                lam_prev = lam
+                lam = L + (1 - C) * f * sin_alpha * (
+                    sigma + C * sin_sigma * (cos_2sm + C * cos_sigma * (-1 + 2 * cos_2sm ** 2))
+                )
+                converged = np.abs(lam - lam_prev) < 1e-12
+                if converged.all():
+                    break
+            
+            u2 = cos2_alpha * (a ** 2 - b ** 2) / b ** 2
+            A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+            B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+            delta_sigma = B * sin_sigma * (cos_2sm + B / 4 * (
+                cos_sigma * (-1 + 2 * cos_2sm ** 2) -
+                B / 6 * cos_2sm * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sm ** 2)
+            ))
+            dist = b * A * (sigma - delta_sigma) / 1000.0
+        
+        return dist, converged & np.isfinite(dist)
+    
+    @staticmethod
+    def paired_distance(src: np.ndarray, dst: np.ndarray, mode: str = None) -> np.ndarray:
+        """Elementwise distance (km) between broadcastable (..., 2) lat-lng arrays."""
+        if mode is None:
+            mode = config.get_geo_params().get('distance_mode', 'geodesic')
+        src = np.asarray(src, dtype=float)
+        dst = np.asarray(dst, dtype=float)
+        lat1, lng1 = np.radians(src[..., 0]), np.radians(src[..., 1])
+        lat2, lng2 = np.radians(dst[..., 0]), np.radians(dst[..., 1])
+        
+        if mode == 'haversine':
+            return GeoUtils._haversine(lat1, lng1, lat2, lng2)
+        if mode != 'geodesic':
+            raise ValueError(f"Unknown distance mode: {mode}")
+        
+        dist, converged = GeoUtils._vincenty(lat1, lng1, lat2, lng2)
+        if not np.all(converged):
+            # Fall back to geopy for pairs where Vincenty did not converge
+            # (flattened, so a single pair's 0-d result is handled too)
+            src_b, dst_b = np.broadcast_arrays(src, dst)
+            src_b, dst_b = src_b.reshape(-1, 2), dst_b.reshape(-1, 2)
+            shape = np.shape(dist)
+            dist = np.array(dist, dtype=float).reshape(-1)
+            for i in np.flatnonzero(~np.asarray(converged)):
+                dist[i] = GeoUtils.calculate_distance(tuple(src_b[i]), tuple(dst_b[i]))
+            dist = dist.reshape(shape)
+        return dist
+    
+    @staticmethod
+    def haversine_matrix(src: Coords, dst: Coords) -> np.ndarray:
+        """Great-circle distance matrix (km) on a spherical earth."""
+        src = np.asarray(src, dtype=float).reshape(-1, 2)
+        dst = np.asarray(dst, dtype=float).reshape(-1, 2)
+        return GeoUtils.paired_distance(src[:, None, :], dst[None, :, :], 'haversine')
+    
+    @staticmethod
+    def vincenty_matrix(src: Coords, dst: Coords) -> np.ndarray:
+        """Ellipsoidal (WGS-84) distance matrix (km) using vectorized Vincenty."""
+        src = np.asarray(src, dtype=float).reshape(-1, 2)
+        dst = np.asarray(dst, dtype=float).reshape(-1, 2)
+        return GeoUtils.paired_distance(src[:, None, :], dst[None, :, :], 'geodesic')
+    
+    @staticmethod
+    def distance_matrix(src: Coords, dst: Coords, mode: str = None) -> np.ndarray:
+        """Distance matrix (km) between two point sets.
+        
+        mode is 'geodesic' (WGS-84, matches geopy within GEODESIC_TOLERANCE_KM)
+        or 'haversine' (spherical, faster); defaults to config geo.distance_mode.
+        """
+        if mode is None:
+            mode = config.get_geo_params().get('distance_mode', 'geodesic')
+        if len(src) == 0 or len(dst) == 0:
+            return np.zeros((len(src), len(dst)))
+        if mode == 'haversine':
+            return GeoUtils.haversine_matrix(src, dst)
+        if mode == 'geodesic':
+            return GeoUtils.vincenty_matrix(src, dst)
+        raise ValueError(f"Unknown distance mode: {mode}")
+    
+    @staticmethod
+    def distance_matrices(fire_coords: Coords, 
+                          water_pts: Coords, 
+                          heli_locs: Coords, 
+                          mode: str = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Fire x water, helicopter x water and fire x helicopter matrices in one call."""
+        return (
+            GeoUtils.distance_matrix(fire_coords, water_pts, mode),
+            GeoUtils.distance_matrix(heli_locs, water_pts, mode),
+            GeoUtils.distance_matrix(fire_coords, heli_locs, mode),
+        )
+    
+    @staticmethod
+    def find_optimal_water_sources(fire_coords: Coords, 
+                                  water_pts: Coords,
+                                  heli_locs: Coords,
+                                  k: int = None,
+                                  heli_water_dist: np.ndarray = None
+                                  ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """For each fire and helicopter, find the optimal water source.
+        
+        Only the k nearest water sources of each fire are considered
+        (config geo.water_candidates_k, default 3). heli_water_dist is an
+        optional precomputed (helicopter x water) distance table; when given,
+        helicopter -> water legs are looked up instead of computed.
+        Returns (helicopter x fire) matrices d1 (helicopter -> water),
+        d2 (water -> fire) and d3 (fire -> helicopter) in km, and the travel
+        time factors of these legs as a (3, helicopter, fire) array, or None
+        with the great_circle provider (config geo.travel_time). The water
+        source minimising the factored round trip is picked.
+        """
+        # Imported here: spatial_index and travel_time depend on this module
+        from spatial_index import WaterSourceIndex
+        from travel_time import get_travel_times
+        
+        if k is None:
+            k = config.get_geo_params().get('water_candidates_k', 3)
+        if len(fire_coords) == 0 or len(heli_locs) == 0:
+            return [], [], [], None
+        
+        fire_arr = np.asarray(fire_coords, dtype=float).reshape(-1, 2)
+        heli_arr = np.asarray(heli_locs, dtype=float).reshape(-1, 2)
             
         # If no water sources available, use dummy point
-        if not water_pts:
+        if len(water_pts) == 0:
             print("Warning: No water sources available. Using dummy water source.")
-            water_pts = [(lat + 0.01, lng + 0.01) for lat, lng in fire_coords]
-        
-        num_heli = len(heli_locs)
-        d1 = [[] for _ in range(num_heli)]  # helicopter -> water
-        d2 = [[] for _ in range(num_heli)]  # water -> fire
-        d3 = [[] for _ in range(num_heli)]  # fire -> helicopter
-        
-        for fire_loc in fire_coords:
-            # Calculate distances to all water sources
-            dist_list = []
-            for water_loc in water_pts:
-                dist_km = GeoUtils.calculate_distance(fire_loc, water_loc)
-                dist_list.append((water_loc, dist_km))
-                
-            # Get 3 nearest water sources
-            nearest_3 = sorted(dist_list, key=lambda x: x[1])[:3]
-            
-            # For each helicopter, find optimal water source
-            for h_idx, heli_loc in enumerate(heli_locs):
-                best_val = float('inf')
-                best_combo = (0, 0, 0)
-                
-                for water_loc, dist_fw in nearest_3:
-                    dist_hw = GeoUtils.calculate_distance(heli_loc, water_loc)  # heli -> water
-                    dist_fh = GeoUtils.calculate_distance(fire_loc, heli_loc)  # fire -> heli
-                    total_dist = dist_hw + dist_fw + dist_fh
-                    
-                    if total_dist < best_val:
-                        best_val = total_dist
-                        best_combo = (dist_hw, dist_fw, dist_fh)
-                
-                d1[h_idx].append(best_combo[0])
-                d2[h_idx].append(best_combo[1])
-                d3[h_idx].append(best_combo[2])
-        
-        return d1, d2, d3
+            water_pts = fire_arr + 0.01
+            heli_water_dist = None
+        water_arr = np.asarray(water_pts, dtype=float).reshape(-1, 2)
+        
+        # Get k nearest water sources per fire from the spatial index
+        nearest, fw = WaterSourceIndex.get(water_arr).query_knn(fire_arr, k)  # fire x k
+        travel_times = get_travel_times()
+        
+        # Helicopter -> candidate water distances, computed once per distinct water
+        cand, pos = np.unique(nearest, return_inverse=True)
+        pos = pos.reshape(nearest.shape)
+        if heli_water_dist is not None:
+            hw = np.asarray(heli_water_dist)[:, nearest]                   # heli x fire x k
+        else:
+            hw = GeoUtils.distance_matrix(heli_arr, water_arr[cand])[:, pos]
+        fh = GeoUtils.distance_matrix(heli_arr, fire_arr)                  # heli x fire
+        
+        if travel_times.is_identity:
+            # For each helicopter, pick the water source minimising the round trip
+            best = np.argmin(hw + fw[None, :, :] + fh[:, :, None], axis=2)[:, :, None]
+            d1 = np.take_along_axis(hw, best, axis=2)[:, :, 0]
+            d2 = np.take_along_axis(np.broadcast_to(fw, hw.shape), best, axis=2)[:, :, 0]
+            return d1, d2, fh, None
+        
+        # Leg factors; helicopter <-> water / fire legs cached per water / fire cell
+        f_hw = travel_times.cached_matrix(water_arr[cand], heli_arr, inbound=True).T[:, pos]
+        f_fw = travel_times.leg_factors(water_arr[nearest], fire_arr[:, None, :])
+        f_fw = np.ones(fw.shape) if f_fw is None else f_fw
+        f_fh = travel_times.cached_matrix(fire_arr, heli_arr).T
+        
+        # For each helicopter, pick the water source minimising the factored round trip
+        total = hw * f_hw + (fw * f_fw)[None, :, :] + (fh * f_fh)[:, :, None]
+        best = np.argmin(total, axis=2)[:, :, None]
+        
+        def pick(values: np.ndarray) -> np.ndarray:
+            return np.take_along_axis(np.broadcast_to(values, hw.shape), best, axis=2)[:, :, 0]
+        
+        d1, d2, d3 = pick(hw), pick(fw), fh                                # km
+        return d1, d2, d3, np.stack([pick(f_hw), pick(f_fw), f_fh])
 
 class ScenarioGenerator:
     """Handles scenario generation for wildfire incidents."""
     
     @staticmethod
-    def group_by_time_proximity(fire_points: List[Dict[str, Any]]) -> List[List[int]]:
+    def _window_breaks(timestamps: np.ndarray, time_window: float) -> np.ndarray:
+        """Mask over consecutive sorted timestamps: True where the gap exceeds the window.
+        
+        Gaps involving a missing timestamp (NaT) always break.
+        """
+        gaps = np.diff(timestamps) / np.timedelta64(1, 'm')
+        return ~(gaps <= time_window)
+    
+    @staticmethod
+    def time_window_groups(timestamps: np.ndarray, time_window: float) -> List[np.ndarray]:
+        """Split fire indices into groups of consecutive fires at most time_window minutes apart.
+        
+        Fires are ordered by timestamp (stable), so groups and their members
+        come out in time order.
+        """
+        timestamps = np.asarray(timestamps, dtype='datetime64[s]')
+        order = np.argsort(timestamps, kind='stable')
+        breaks = np.nonzero(ScenarioGenerator._window_breaks(timestamps[order], time_window))[0] + 1
+        return np.split(order, breaks)
+    
+    @staticmethod
+    def group_by_time_proximity(fire_points: Fires) -> List[List[int]]:
         """Group fires that occur within configured time window into scenarios."""
-        if not fire_points:
+        if not len(fire_points):
             return []
-            
+        fires = FireTable.coerce(fire_points)
         time_window = config.get_optimization_params()['scenario_time_window_minutes']
+        return [group.tolist() for group in ScenarioGenerator.time_window_groups(fires.timestamp, time_window)]
+    
+    @staticmethod
+    def reachability_components(feasible: np.ndarray) -> List[np.ndarray]:
+        """Split a scenario's fires into independent subproblems.
         
-        # Convert fires to (index, datetime) pairs
-        temp_list = []
-        for i, f in enumerate(fire_points):
-            dt_str = f['date'] + " " + f['time']  # "YYYY-MM-DD HH:MM"
-            dt_fmt = datetime.datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-            temp_list.append((i, dt_fmt))
-
-        # Sort by datetime
-        temp_list.sort(key=lambda x: x[1])
+        feasible is the (helicopter x fire) mask of assignable pairs. Fires are
+        connected when some helicopter can reach both; each connected component
+        can be solved on its own. Components are ordered by their first fire.
+        """
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import connected_components
+        
+        feasible = np.asarray(feasible, dtype=bool)
+        shared = feasible.T.astype(int) @ feasible.astype(int)
+        _, labels = connected_components(csr_matrix(shared > 0), directed=False)
+        order = np.argsort(labels, kind='stable')
+        return np.split(order, np.nonzero(np.diff(labels[order]))[0] + 1)
+    
+    @staticmethod
+    def stream_groups(batches: Iterable[Fires], 
+                      time_window: Optional[float] = None) -> Iterator[Tuple[List[int], FireTable]]:
+        """Group fires arriving in batches, yielding each group once its window closes.
+        
+        See OnlineScenarioGrouper; fire indices count across batches.
+        """
+        grouper = OnlineScenarioGrouper(time_window)
+        for batch in batches:
+            yield from grouper.push(batch)
+        yield from grouper.flush()
 
-        # Group fires within time window
-        scenario_sets = []
-        current_set = []
-        for idx, dt in temp_list:
-            if not current_set:
-                current_set.append((idx, dt))
-            else:
-                prev_dt = current_set[-1][1]
-                diff_mins = (dt - prev_dt).total_seconds() / 60.0
-                # Same scenario group if within time window
-                if diff_mins <= time_window:
-                    current_set.append((idx, dt))
-                else:
-                    scenario_sets.append([x[0] for x in current_set])
-                    current_set = [(idx, dt)]
-        
-        # Add final group if exists
-        if current_set:
-            scenario_sets.append([x[0] for x in current_set])
 
-        return scenario_sets
\ No newline at end of file
+class OnlineScenarioGrouper:
+    """Incremental time-window grouping for fires that arrive in time order.
+    
+    A group is emitted as soon as a fire arrives more than the window after
+    the group's latest fire. Fires are numbered in arrival order. Each batch
+    is sorted by time; a fire older than the open group joins it, since
+    groups already emitted are never reopened.
+    """
+    
+    def __init__(self, time_window: Optional[float] = None):
+        """Create a grouper using the configured scenario window unless one is given."""
+        if time_window is None:
+            time_window = config.get_optimization_params()['scenario_time_window_minutes']
+        self.time_window = time_window
+        self._open_indices: List[np.ndarray] = []
+        self._open_fires: List[FireTable] = []
+        self._last_timestamp = None
+        self._num_seen = 0
+    
+    def push(self, fire_points: Fires) -> List[Tuple[List[int], FireTable]]:
+        """Add a batch of fires and return the groups it closes, as (fire indices, fires)."""
+        fires = FireTable.coerce(fire_points)
+        indices = np.arange(self._num_seen, self._num_seen + len(fires))
+        self._num_seen += len(fires)
+        if not len(fires):
+            return []
+        
+        order = np.argsort(fires.timestamp, kind='stable')
+        timestamps = fires.timestamp[order]
+        if self._last_timestamp is None:
+            breaks = np.nonzero(ScenarioGenerator._window_breaks(timestamps, self.time_window))[0] + 1
+        else:
+            # Position 0 breaks away from the open group
+            timestamps_with_open = np.concatenate([[self._last_timestamp], timestamps])
+            breaks = np.nonzero(ScenarioGenerator._window_breaks(timestamps_with_open, self.time_window))[0]
+        
+        closed = []
+        for k, segment in enumerate(np.split(order, breaks)):
+            if k > 0:
+                closed.extend(self.flush())
+            if len(segment):
+                self._open_indices.append(indices[segment])
+                self._open_fires.append(fires.take(segment))
+        newest = timestamps[-1]
+        if len(breaks) or self._last_timestamp is None or newest > self._last_timestamp:
+            self._last_timestamp = newest
+        return closed
+    
+    def flush(self) -> List[Tuple[List[int], FireTable]]:
+        """Close the open group (end of stream) and return it, if any."""
+        if not self._open_indices:
+            return []
+        group = (np.concatenate(self._open_indices).tolist(), FireTable.concat(self._open_fires))
+        self._open_indices, self._open_fires = [], []
+        return [group]